@@ -0,0 +1,88 @@
+# Compliance column parsing: the original per-row json.loads(value.replace("'", '"')) with a list membership
+# test, against cisreport.parsing (orjson or json fast path, literal_eval fallback, compiled key index).
+#   python benchmarks/compliance_parser.py --hosts 20 --rows 2000 --apostrophes 0.02
+import os
+import sys
+import json
+import time
+import random
+import argparse
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+from synthetic import rule_catalog
+from cisreport import parsing
+from cisreport.compliance import COMPLIANCE_MAPPING
+from cisreport.parsing import parse_compliance, standard_index
+
+SELECTED = ['hipaa', 'nist_800_53', 'pci_dss', 'gdpr_IV']
+
+def compliance_column(hosts, rows, keys_per_row, apostrophes, seed=0):
+    # Every host exports the same rule set, like real fleets scanned with one benchmark
+    rng = random.Random(seed)
+    values = []
+    for rule in rule_catalog(rows, keys_per_row, 20, seed):
+        items = eval(rule['Compliance'])  # our own synthetic repr
+        if rng.random() < apostrophes:
+            items[0]['value'] += " (Article 32's scope)"  # repr switches this value to double quotes
+        values.append(str(items))
+    return values * hosts
+
+def legacy(values):
+    selected = list(SELECTED)
+    count = failed = 0
+    for value in values:
+        try:
+            items = json.loads(value.replace("'", "\""))
+        except ValueError:
+            failed += 1  # the original process_csv raised here and lost the whole host
+            continue
+        for item in items:
+            if item['key'] in selected:
+                count += 1
+    return count, failed
+
+def current(values):
+    parse_compliance.cache_clear()
+    index = standard_index(SELECTED, COMPLIANCE_MAPPING)
+    count = 0
+    for value in values:
+        count += sum(1 for key, _ in parse_compliance(value) if key in index)
+    return count, 0
+
+def timed(function, values):
+    start = time.perf_counter()
+    result = function(values)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Compliance column parsing.')
+    parser.add_argument('--hosts', type=int, default=20)
+    parser.add_argument('--rows', type=int, default=2000, help='rules per host')
+    parser.add_argument('--keys-per-row', type=int, default=3)
+    parser.add_argument('--apostrophes', type=float, default=0.02, help='fraction of rules with an apostrophe in a value')
+    args = parser.parse_args()
+
+    values = compliance_column(args.hosts, args.rows, args.keys_per_row, args.apostrophes)
+    print(f"{len(values)} rows, {len(set(values))} distinct Compliance values")
+    loads = parsing._loads
+    runs = [('legacy json.loads per row', legacy, loads)]
+    if loads is not json.loads:
+        runs.append(('cisreport.parsing (orjson)', current, loads))
+    runs.append(('cisreport.parsing (json)', current, json.loads))
+    for label, function, fast_loads in runs:
+        parsing._loads = fast_loads
+        seconds, (items, failed) = timed(function, values)
+        print(f"{label:<30} {seconds:7.3f}s {len(values) / seconds:>10,.0f} rows/s {items:>8} items {failed:>5} unparsed rows")
+    parsing._loads = loads
+
+    # Uncached cost per distinct value, i.e. the first host of a run
+    distinct = list(dict.fromkeys(values))
+    for label, fast_loads in [('orjson', loads), ('json', json.loads)]:
+        parsing._loads = fast_loads
+        seconds, _ = timed(current, distinct)
+        print(f"distinct values only ({label}): {seconds * 1e6 / len(distinct):.1f} us each")
+    parsing._loads = loads
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# Peak RSS of the narrative PDF (pdfgen) as the CSV grows, built in one piece and in segments.
+# reportlab keeps every page of a document until it is saved, so the single build grows with the input
+# while the segmented build (generate_pdf_from_csv(..., max_memory_mb=...)) should stay flat. Exits with an
+# error if a segmented build peaks above the ceiling, or if its peak grows by more than --max-growth MB
+# from the smallest to the largest input.
+#   python benchmarks/narrative_memory.py --rows 2000,8000,32000 --max-memory 150
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+from suite import count_pdf_pages, peak_rss_mb
+
+def process_peak_rss_mb():
+    # VmHWM belongs to this process's address space; ru_maxrss would carry over the high-water mark of
+    # the parent this worker was spawned from (fork + exec keep it), which holds the synthetic catalog
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+def run(csv_path, output_path, max_memory_mb, segment_pages):
+    from cisreport.narrative import generate_pdf_from_csv
+    start = time.perf_counter()
+    generate_pdf_from_csv(csv_path, '', 'Benchmark', 'https://example.com', output_path,
+                          max_memory_mb=max_memory_mb, segment_pages=segment_pages)
+    return time.perf_counter() - start, process_peak_rss_mb()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark narrative PDF memory against CSV size.')
+    parser.add_argument('--rows', default='2000,8000,32000', help='comma separated failure counts')
+    parser.add_argument('--text-length', type=int, default=400)
+    parser.add_argument('--max-memory', type=float, default=150, help='ceiling for the segmented build, in MB')
+    parser.add_argument('--segment-pages', type=int, default=None)
+    parser.add_argument('--max-growth', type=float, default=8,
+                        help='allowed rise of the segmented peak RSS across the row counts, in MB (default: 8)')
+    args = parser.parse_args()
+
+    from synthetic import rule_catalog, write_host_csv
+    context = multiprocessing.get_context('spawn')
+    segmented_peaks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in [int(rows) for rows in args.rows.split(',')]:
+            csv_path = os.path.join(tmp, f'host-{rows}.csv')
+            write_host_csv(csv_path, rule_catalog(rows, 3, args.text_length, 0), 0)
+            csv_mb = os.path.getsize(csv_path) / (1024 * 1024)
+            for label, max_memory_mb, segment_pages in [('single', None, None),
+                                                        ('segmented', args.max_memory, args.segment_pages)]:
+                output_path = os.path.join(tmp, f'host-{rows}-{label}.pdf')
+                # a fresh process per run, so the peak RSS is this run's
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    seconds, rss = executor.submit(run, csv_path, output_path, max_memory_mb, segment_pages).result()
+                print(f"{rows:>7} rows {csv_mb:7.1f}MB csv {label:<10} {seconds:7.1f}s pages={count_pdf_pages(output_path):<6} "
+                      f"size={os.path.getsize(output_path) / (1024 * 1024):.1f}MB peak_rss={rss:.0f}MB", flush=True)
+                os.remove(output_path)
+                if label == 'segmented' and rss is not None:
+                    segmented_peaks.append((rows, rss))
+
+    failures = [f"{rows} rows: segmented peak {rss:.0f}MB is above the {args.max_memory:.0f}MB ceiling"
+                for rows, rss in segmented_peaks if rss > args.max_memory]
+    if len(segmented_peaks) > 1:
+        (smallest, first), (largest, last) = min(segmented_peaks), max(segmented_peaks)
+        if last - first > args.max_growth:
+            failures.append(f"segmented peak grew {last - first:.0f}MB from {smallest} to {largest} rows "
+                            f"(allowed: {args.max_growth:.0f}MB)")
+    if failures:
+        print('FAILED:\n  ' + '\n  '.join(failures))
+        return 1
+    print('Segmented peak RSS stayed flat.' if len(segmented_peaks) > 1 else 'Segmented peak RSS stayed under the ceiling.')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,250 @@
+# Benchmark and regression suite for the report generators.
+#
+#   python benchmarks/suite.py                      run every case and print the results
+#   python benchmarks/suite.py --save-baseline      ... and store them in benchmarks/baseline.json
+#   python benchmarks/suite.py --compare            ... and exit 1 if a case regressed against the baseline
+#
+# Each case runs in a fresh process on synthetic CSVs (see synthetic.py) so peak RSS is per case, --repeat
+# times (default 3); times and peak RSS are the best of those runs, so one slow run does not flag a regression.
+# Stage times are measured by running the pipeline cumulatively and taking differences:
+#   parse   reading the CSV
+#   explode Compliance column parsing / explosion (compliance cases only)
+#   layout  building the flowables (page-sized tables, or narrative paragraphs)
+#   write   reportlab build and writing the PDF (and remediation file)
+import os
+import re
+import sys
+import csv
+import json
+import time
+import argparse
+import platform
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+STANDARDS = ['hipaa', 'nist_800_53', 'pci_dss', 'gdpr_IV']
+
+CASES = {
+    'compliance-1k': dict(kind='compliance', rows=1000, keys_per_row=3, text_length=200),
+    'compliance-5k': dict(kind='compliance', rows=5000, keys_per_row=3, text_length=200),
+    'narrative-300': dict(kind='narrative', rows=300, keys_per_row=3, text_length=400),
+    'narrative-1500': dict(kind='narrative', rows=1500, keys_per_row=3, text_length=400),
+    'fleet-16x500': dict(kind='fleet', hosts=16, rows=500, keys_per_row=3, text_length=200, workers=4),
+    'combined-16x500': dict(kind='combined', hosts=16, rows=500, keys_per_row=3, text_length=200, workers=4),
+    'exports-16x500': dict(kind='fleet', hosts=16, rows=500, keys_per_row=3, text_length=200, workers=4,
+                           formats=('html', 'csv', 'jsonl')),
+}
+
+# A metric regresses when it is both `tolerance` times and `min_delta` worse than the baseline. Times below
+# a quarter second move by more than that between identical runs, so they cannot regress on their own; nor
+# can a time that grew by less than TIME_FLOOR_FRACTION of the case's baseline wall time.
+REGRESSION_METRICS = {'wall': 0.25, 'parse': 0.25, 'explode': 0.25, 'layout': 0.25, 'write': 0.25,
+                      'peak_rss_mb': 5.0, 'output_bytes': 4096}
+TIME_METRICS = ('wall', 'parse', 'explode', 'layout', 'write')
+TIME_FLOOR_FRACTION = 0.1
+# Metrics that vary from run to run; the other ones are the same for every run of a case
+BEST_OF_METRICS = ('wall', 'parse', 'explode', 'layout', 'write', 'peak_rss_mb')
+
+def count_pdf_pages(file_path):
+    with open(file_path, 'rb') as f:
+        return len(re.findall(rb'/Type /Page\b(?!s)', f.read()))
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None  # not available on Windows
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+def run_compliance(csv_path, output_path):
+    # process_host writes output_path, the PDF next to the CSV
+    import pandas as pd
+    from reportlab.lib.styles import getSampleStyleSheet
+    from cisreport.compliance import CSV_COLUMNS, make_table_renderer, process_host, read_host
+    start = time.perf_counter()
+    pd.read_csv(csv_path, usecols=CSV_COLUMNS, dtype=str)
+    parsed = time.perf_counter()
+    records = read_host(csv_path, STANDARDS)
+    exploded = time.perf_counter()
+    list(make_table_renderer(getSampleStyleSheet()['Normal']).tables(records.table_rows(), 455, 275))
+    laid_out = time.perf_counter()
+    process_host(csv_path, STANDARDS, 'Benchmark', '')  # the PDF and remediation file in one pass
+    written = time.perf_counter()
+    write = (written - laid_out) - (laid_out - parsed)  # process_host repeats read_host and the layout
+    return {
+        'parse': parsed - start,
+        'explode': max(0.0, (exploded - parsed) - (parsed - start)),  # read_host also reads the CSV
+        'layout': laid_out - exploded,
+        'write': max(0.0, write),
+        'wall': written - laid_out,
+    }
+
+def run_narrative(csv_path, output_path):
+    from cisreport.narrative import generate_pdf_from_csv, iter_failure_flowables
+    start = time.perf_counter()
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        for _ in csv.DictReader(f):
+            pass
+    parsed = time.perf_counter()
+    for _ in iter_failure_flowables(csv_path, 'Benchmark'):
+        pass
+    laid_out = time.perf_counter()
+    generate_pdf_from_csv(csv_path, '', 'Benchmark', 'https://example.com', output_path)
+    written = time.perf_counter()
+    return {
+        'parse': parsed - start,
+        'layout': max(0.0, (laid_out - parsed) - (parsed - start)),
+        'write': max(0.0, (written - laid_out) - (laid_out - parsed)),
+        'wall': written - laid_out,
+    }
+
+def run_fleet(folder_path, workers, formats=('pdf',)):
+    from cisreport.compliance import process_folder
+    start = time.perf_counter()
+    summary = process_folder(folder_path, STANDARDS, 'Benchmark', '', max_workers=workers, force=True, formats=formats)
+    if summary.failed:
+        raise RuntimeError(summary.format(verbose=True))
+    return {'wall': time.perf_counter() - start}
+
+def run_combined(folder_path, workers):
+    from cisreport.combined import write_combined_report
+    start = time.perf_counter()
+    summary = write_combined_report(folder_path, STANDARDS, 'Benchmark', '', max_workers=workers)
+    if summary.failed:
+        raise RuntimeError(summary.format(verbose=True))
+    return {'wall': time.perf_counter() - start}
+
+def run_case(name, case):
+    from synthetic import generate_fleet
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_paths = generate_fleet(tmp, case.get('hosts', 1), case['rows'], case['keys_per_row'], case['text_length'])
+        if case['kind'] == 'fleet':
+            result = run_fleet(tmp, case.get('workers'), case.get('formats', ('pdf',)))
+        elif case['kind'] == 'combined':
+            result = run_combined(tmp, case.get('workers'))
+        else:
+            output_path = os.path.splitext(csv_paths[0])[0] + '.pdf'
+            runner = run_compliance if case['kind'] == 'compliance' else run_narrative
+            result = runner(csv_paths[0], output_path)
+        pdf_paths = [os.path.join(tmp, f) for f in os.listdir(tmp) if f.endswith('.pdf')]
+        pages = sum(count_pdf_pages(path) for path in pdf_paths)
+        export_dir = os.path.join(tmp, 'exports')
+        output_paths = pdf_paths + ([os.path.join(export_dir, f) for f in os.listdir(export_dir)]
+                                    if os.path.isdir(export_dir) else [])
+        result.update({
+            'pages': pages,
+            'pages_per_sec': pages / result['wall'] if result['wall'] else 0.0,
+            'output_bytes': sum(os.path.getsize(path) for path in output_paths),
+            'peak_rss_mb': peak_rss_mb(),
+        })
+    return result
+
+def best_of(runs):
+    result = dict(runs[0])
+    for metric in BEST_OF_METRICS:
+        values = [run[metric] for run in runs if run.get(metric) is not None]
+        if values:
+            result[metric] = min(values)
+    result['pages_per_sec'] = result['pages'] / result['wall'] if result['wall'] else 0.0
+    return result
+
+def run_suite(names, repeat=1):
+    # spawn, so every run starts from a clean interpreter and its own peak RSS
+    # (executor workers, unlike multiprocessing.Pool ones, may start the fleet case's own pool).
+    # Repeats go round the cases rather than back to back, so a slow spell on the machine hits one run of
+    # several cases instead of every run of one.
+    context = multiprocessing.get_context('spawn')
+    runs = {name: [] for name in names}
+    for _ in range(repeat):
+        for name in names:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                runs[name].append(executor.submit(run_case, name, CASES[name]).result())
+    results = {name: best_of(runs[name]) for name in names}
+    for name in names:
+        print(format_result(name, results[name]), flush=True)
+    return results
+
+def format_value(value, digits=2):
+    return 'n/a' if value is None else f"{value:.{digits}f}"
+
+def format_result(name, result):
+    stages = ' '.join(f"{stage}={result[stage]:.2f}s" for stage in ('parse', 'explode', 'layout', 'write') if stage in result)
+    return (f"{name:<16} wall={result['wall']:.2f}s {stages} pages={result['pages']} "
+            f"pages/s={result['pages_per_sec']:.1f} size={result['output_bytes'] / 1024:.0f}KB "
+            f"rss={format_value(result['peak_rss_mb'], 0)}MB")
+
+def machine_info():
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count()}
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"{name}: no baseline, skipped")
+            continue
+        for metric, min_delta in REGRESSION_METRICS.items():
+            new, old = result.get(metric), base.get(metric)
+            if new is None or old is None:
+                continue
+            if metric in TIME_METRICS:
+                min_delta = max(min_delta, TIME_FLOOR_FRACTION * base.get('wall', 0.0))
+            if new > old * (1 + tolerance) and new - old > min_delta:
+                regressions.append(f"{name} {metric}: {old:.3f} -> {new:.3f} (+{(new / old - 1) * 100 if old else float('inf'):.0f}%)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the CIS report generators.')
+    parser.add_argument('--cases', default=','.join(CASES), help=f"comma separated, from: {', '.join(CASES)}")
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE, help='store results as the baseline')
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, help='fail if results regress against the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown (default: 0.25)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case, keeping the best (default: 3)')
+    args = parser.parse_args()
+
+    names = args.cases.split(',')
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+    if hasattr(os, 'getloadavg') and os.getloadavg()[0] > 0.5 * (os.cpu_count() or 1):
+        # other work competing for the CPUs slows every case alike; record and compare on a quiet machine
+        print(f"Warning: load average {os.getloadavg()[0]:.1f} on {os.cpu_count()} CPUs, times are unreliable")
+    results = run_suite(names, args.repeat)
+
+    if args.save_baseline:
+        # cases not run keep their baseline when it was recorded on this machine
+        saved = {}
+        try:
+            with open(args.save_baseline, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+            if previous.get('machine') == machine_info():
+                saved = previous['results']
+        except (OSError, ValueError, KeyError):
+            pass
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'machine': machine_info(), 'results': dict(saved, **results)}, f, indent=1, sort_keys=True)
+        print(f"Baseline saved to {args.save_baseline}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('machine') != machine_info():
+            print(f"Warning: baseline was recorded on {baseline.get('machine')}")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print('Regressions:\n  ' + '\n  '.join(regressions))
+            return 1
+        print('No regressions.')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
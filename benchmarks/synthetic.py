@@ -0,0 +1,74 @@
+# Synthetic CIS Benchmark exports for benchmarking.
+#   python benchmarks/synthetic.py OUTPUT_FOLDER --hosts 50 --rows 2000 --keys-per-row 3 --text-length 300
+import os
+import csv
+import random
+import argparse
+
+CSV_FIELDS = ['Title', 'Description', 'References', 'Rationale', 'Compliance', 'Result', 'Remediation']
+COMPLIANCE_KEYS = ['hipaa', 'nist_800_53', 'pci_dss', 'gdpr_IV', 'iso_27001', 'cis_csc_v8']
+RESULTS = ['PASSED', 'FAILED', 'FAILED', 'WARNING', 'Not Applicable']
+WORDS = (
+    'ensure policy audit account logon password minimum length lockout threshold service '
+    'firewall domain profile registry value enabled disabled administrator remote desktop '
+    'configure setting windows defender credential guard user rights assignment'
+).split()
+
+def sentence(rng, text_length):
+    words = []
+    length = 0
+    while length < text_length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words).capitalize() + '.'
+
+def rule_catalog(rows, keys_per_row, text_length, seed=0):
+    # The rule set is shared by every host, like real exports of one benchmark
+    rng = random.Random(seed)
+    catalog = []
+    for i in range(rows):
+        keys = rng.sample(COMPLIANCE_KEYS, min(keys_per_row, len(COMPLIANCE_KEYS)))
+        compliance = [{'key': key, 'value': f"{key.split('_')[0].upper()}-{rng.randint(1, 40)}({rng.randint(1, 9)})"} for key in keys]
+        catalog.append({
+            'Title': f"{i + 1}.{rng.randint(1, 20)} (L1) {sentence(rng, 60)}",
+            'Description': sentence(rng, text_length),
+            'References': f"https://www.cisecurity.org/benchmark/{rng.randint(1000, 9999)}",
+            'Rationale': sentence(rng, text_length),
+            'Compliance': str(compliance),
+            'Remediation': sentence(rng, text_length),
+        })
+    return catalog
+
+def write_host_csv(file_path, catalog, seed):
+    rng = random.Random(seed)
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for rule in catalog:
+            writer.writerow(dict(rule, Result=rng.choice(RESULTS)))
+
+def generate_fleet(folder_path, hosts=1, rows=1000, keys_per_row=3, text_length=200, seed=0):
+    os.makedirs(folder_path, exist_ok=True)
+    catalog = rule_catalog(rows, keys_per_row, text_length, seed)
+    paths = []
+    for host in range(hosts):
+        file_path = os.path.join(folder_path, f"WS-{host:05d}.csv")
+        write_host_csv(file_path, catalog, seed + host + 1)
+        paths.append(file_path)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description='Write synthetic CIS Benchmark CSV exports.')
+    parser.add_argument('folder')
+    parser.add_argument('--hosts', type=int, default=1)
+    parser.add_argument('--rows', type=int, default=1000, help='rules per host')
+    parser.add_argument('--keys-per-row', type=int, default=3, help='compliance items per rule')
+    parser.add_argument('--text-length', type=int, default=200, help='characters in description/rationale/remediation')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    paths = generate_fleet(args.folder, args.hosts, args.rows, args.keys_per_row, args.text_length, args.seed)
+    print(f"Wrote {len(paths)} CSVs to {args.folder}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+# Time and peak traced memory of the compliance table PDF (cisreport.compliance.generate_pdf) vs. row count.
+#   python benchmarks/table_render.py 500 2000 10000
+import os
+import sys
+import time
+import random
+import tempfile
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pandas as pd
+from cisreport.compliance import PROCESSED_COLUMNS, generate_pdf
+
+def synthetic_rows(row_count, seed=0):
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        'Computer Name': 'WS-0001',
+        'Rule Information': [f"(L1) Ensure 'Audit policy setting {i % 400}' is set to 'Success and Failure'" for i in range(row_count)],
+        'Compliance Standard': [rng.choice(['HIPAA', 'NIST', 'PCI DSS', 'GDPR']) for _ in range(row_count)],
+        'Compliance Rule': [f"AU-{i % 50}" for i in range(row_count)],
+        'Status': [rng.choice(['PASSED', 'FAILED']) for _ in range(row_count)],
+        'Remediation': 'Set the policy to Enabled.'
+    }, columns=PROCESSED_COLUMNS)
+
+def main(row_counts):
+    print(f"{'rows':>8} {'seconds':>8} {'rows/s':>8} {'peak MB':>8} {'PDF KB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, 'bench.pdf')
+        for row_count in row_counts:
+            data = synthetic_rows(row_count)
+            start = time.perf_counter()
+            generate_pdf(data, 'Benchmark', '', output_path)
+            elapsed = time.perf_counter() - start
+            # second, traced run: tracemalloc slows allocation-heavy code too much to time under it
+            tracemalloc.start()
+            generate_pdf(data, 'Benchmark', '', output_path)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{row_count:>8} {elapsed:>8.2f} {row_count / elapsed:>8.0f} {peak / 1e6:>8.1f} {os.path.getsize(output_path) / 1024:>8.0f}")
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [500, 2000, 10000])
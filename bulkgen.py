@@ -1,21 +1,19 @@
-import os
 import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch, cm
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-import csv
-from PIL import Image as PILImage, ImageOps, ImageChops
-from datetime import datetime
+from tkinter import messagebox
+from cisreport.narrative import BULK_MAX_FAILURES, generate_folder_pdfs
+from cisreport.narrative import generate_pdf_from_csv  # used to be defined here, kept importable
+from cisreport.scheduler import JobScheduler
+
+POLL_MS = 100  # how often the window picks up progress from the scheduler
 
 class PDFGeneratorApp:
     
     def __init__(self, root):
         self.root = root
         self.root.title("CIS Benchmark | Made with ❤️ by Steven Olsen")
+        self.scheduler = JobScheduler()
         
         # Folder Selection
         self.folder_frame = ttk.LabelFrame(root, text="Folder Selection")
@@ -39,14 +37,23 @@ class PDFGeneratorApp:
         self.report_url = tk.StringVar()
         ttk.Label(self.info_frame, text="Footer URL:").grid(row=0, column=0, sticky="e", padx=5, pady=5)
         ttk.Entry(self.info_frame, textvariable=self.report_url).grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        self.max_failures = tk.StringVar(value=str(BULK_MAX_FAILURES))
+        ttk.Label(self.info_frame, text="Max Failures:").grid(row=1, column=0, sticky="e", padx=5, pady=5)
+        ttk.Entry(self.info_frame, textvariable=self.max_failures).grid(row=1, column=1, padx=5, pady=5, sticky="ew")  # blank or 0 lists all
+        self.force_rebuild = tk.BooleanVar()
+        ttk.Checkbutton(self.info_frame, text="Rebuild unchanged PDFs", variable=self.force_rebuild).grid(row=2, column=1, padx=5, pady=5, sticky="w")
         
         # Generate PDF
         self.gen_frame = ttk.LabelFrame(root, text="Generate PDF")
         self.gen_frame.grid(row=3, column=0, padx=10, pady=5, sticky="ew")
         self.status_label = ttk.Label(self.gen_frame, text="Status: Awaiting Input")
-        self.status_label.grid(row=0, column=0, columnspan=2, padx=5, pady=5, sticky="ew")
+        self.status_label.grid(row=0, column=0, columnspan=4, padx=5, pady=5, sticky="ew")
         ttk.Button(self.gen_frame, text="Generate PDF", command=self.generate_pdf).grid(row=1, column=0, padx=5, pady=5)
-        ttk.Button(self.gen_frame, text="Exit", command=root.quit).grid(row=1, column=1, padx=5, pady=5)
+        self.pause_button = ttk.Button(self.gen_frame, text="Pause", command=self.toggle_pause)
+        self.pause_button.grid(row=1, column=1, padx=5, pady=5)
+        ttk.Button(self.gen_frame, text="Cancel", command=self.scheduler.cancel).grid(row=1, column=2, padx=5, pady=5)
+        ttk.Button(self.gen_frame, text="Exit", command=self.exit).grid(row=1, column=3, padx=5, pady=5)
+        self.root.after(POLL_MS, self.poll_scheduler)
         
     def browse_folder(self):
         folder_path = filedialog.askdirectory(title="Select Folder Containing CSVs")
@@ -57,78 +64,55 @@ class PDFGeneratorApp:
         self.logo_path.set(file_path)
 
     def generate_pdf(self):
+        max_failures = self.max_failures.get().strip()
+        if max_failures and not max_failures.isdigit():
+            self.status_label.config(text="Status: Max Failures must be a number!")
+            return
+        # batches queue up and run one after another
         folder_path = self.folder_path.get()
-        for csv_file in os.listdir(folder_path):
-            if csv_file.endswith('.csv'):
-                csv_path = os.path.join(folder_path, csv_file)
-                report_title = f"Workstation: {os.path.splitext(csv_file)[0]}"  # Extract filename without extension
-                output_path = os.path.join(folder_path, f"{os.path.splitext(csv_file)[0]}.pdf")
-                success = generate_pdf_from_csv(csv_path, self.logo_path.get(), report_title, self.report_url.get(), output_path)
-                if success:
-                    self.status_label.config(text=f"Status: PDF Generation Successful for {csv_file}!")
-                else:
-                    self.status_label.config(text=f"Status: PDF Generation Failed for {csv_file}!")
+        self.scheduler.submit(folder_path, generate_folder_pdfs, folder_path, self.logo_path.get(), self.report_url.get(),
+                              int(max_failures or 0), force=self.force_rebuild.get())
+        self.status_label.config(text=f"Status: Queued {folder_path} ({len(self.scheduler.pending())} waiting)")
 
-def generate_pdf_from_csv(csv_path, logo_path, report_title, footer_url, output_path):
-    doc = SimpleDocTemplate(output_path, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-    title_style = styles['Heading1']
-    desc_style = styles['BodyText']
-    ref_style = ParagraphStyle('ReferenceStyle', parent=styles['BodyText'], textColor=colors.blue)
-    rationale_style = styles['Italic']
-    
-    elements.append(Paragraph(report_title, title_style))
-    
-    if logo_path:
-        try:
-            pil_img = PILImage.open(logo_path)
-            w, h = pil_img.size
-            aspect_ratio = w / h
-            new_width = min(150, w)
-            new_height = new_width / aspect_ratio
-            pil_img = pil_img.resize((int(new_width), int(new_height)), PILImage.LANCZOS)
-            logo_path_resized = "temp_resized_logo.png"
-            pil_img.save(logo_path_resized, "PNG")
-            logo = Image(logo_path_resized)
-            elements.append(logo)
-        except Exception as e:
-            print(f"Error processing logo: {e}")
-    
-    with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            row_count = sum(1 for row in reader)
-            csvfile.seek(0)  # Reset the file pointer to the beginning
-            reader = csv.DictReader(csvfile)  # Reinitialize the reader
-            for index, row in enumerate(reader):
-                if index >= 30:
-                    break
-                elements.append(Paragraph(f"Failed: {row['Title']}", title_style))
-                elements.append(Paragraph(f"Description: {row['Description']}", desc_style))
-                reference = row.get('References', 'N/A')
-                elements.append(Paragraph(f"Reference: {reference}", ref_style))
-                elements.append(Spacer(1, 12))  
-                elements.append(Paragraph(f"Rationale: {row['Rationale']}", rationale_style))
-                elements.append(Spacer(1, inch))
-                
-    if row_count > 30:
-        note = "Note: This report contains the first 30 failures identified. Please review the CSV file for additional failures."
-        elements.append(Paragraph(note, desc_style))
-        elements.append(Spacer(1, inch))
+    def toggle_pause(self):
+        if self.scheduler.paused:
+            self.scheduler.resume()
+            self.pause_button.config(text="Pause")
+        else:
+            self.scheduler.pause()
+            self.pause_button.config(text="Resume")
 
-    def footer(canvas, doc):
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        footer_text = f"{footer_url} - Generated on: {timestamp}"
-        canvas.saveState()
-        canvas.drawString(inch, 0.75 * inch, footer_text)
-        canvas.drawRightString(10 * inch - 2*inch, 0.75 * inch, f"Page {canvas.getPageNumber()}")
-        canvas.restoreState()
-        
-    doc.build(elements, onFirstPage=footer, onLaterPages=footer)
-    
-    return True
+    def poll_scheduler(self):
+        for event in self.scheduler.poll():
+            self.show_event(event)
+        self.root.after(POLL_MS, self.poll_scheduler)
+
+    def show_event(self, event):
+        batch = event.batch
+        if event.kind == 'started':
+            self.status_label.config(text=f"Status: Generating {batch.label}...")
+        elif event.kind == 'progress':
+            outcome = "Successful" if event.result.ok else "Failed"
+            self.status_label.config(text=f"Status: PDF Generation {outcome} for {event.result.name}! {event.text}")
+        elif batch.error:
+            self.status_label.config(text=f"Status: Error: {batch.error}")
+        elif batch.summary is None:  # cancelled before it started
+            self.status_label.config(text=f"Status: Cancelled {batch.label}")
+        else:
+            summary = batch.summary
+            cancelled = f", {len(summary.cancelled)} cancelled" if summary.cancelled else ""
+            self.status_label.config(text=f"Status: {len(summary.succeeded)} succeeded, {len(summary.failed)} failed, "
+                                          f"{len(summary.skipped)} unchanged{cancelled} in {summary.wall_time:.1f}s")
+            if summary.failed:
+                failed_names = ', '.join(r.name for r in summary.failed)
+                messagebox.showwarning("PDF Generation", f"{len(summary.failed)} failed: {failed_names}")
+
+    def exit(self):
+        self.scheduler.shutdown()  # cancels queued work and waits for the files in progress
+        self.root.quit()
 
-root = tk.Tk()
-root.geometry("450x350")  # 800 pixels wide and 500 pixels tall
-app = PDFGeneratorApp(root)
-root.mainloop()
\ No newline at end of file
+if __name__ == '__main__':
+    root = tk.Tk()
+    root.geometry("450x350")  # 800 pixels wide and 500 pixels tall
+    app = PDFGeneratorApp(root)
+    root.mainloop()
@@ -0,0 +1,27 @@
+# GUI-free core of the CIS report generators. Submodules are only imported when one of
+# their names is first used, so `import cisreport` does not pull in pandas or reportlab.
+import importlib
+
+_EXPORTS = {
+    'generate_pdf_from_csv': 'narrative',
+    'generate_workstation_pdf': 'narrative',
+    'generate_folder_pdfs': 'narrative',
+    'COMPLIANCE_MAPPING': 'compliance',
+    'process_csv': 'compliance',
+    'process_host': 'compliance',
+    'process_folder': 'compliance',
+    'generate_pdf': 'compliance',
+    'generate_remediation_file': 'compliance',
+    'run_fleet': 'fleet',
+    'run_incremental': 'manifest',
+    'load_logo': 'assets',
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,127 @@
+import os
+import io
+import hashlib
+import threading
+
+LOGO_MAX_WIDTH = 150
+LOGO_MAX_HEIGHT = 150
+CACHE_DIR_ENV = 'CIS_REPORT_CACHE_DIR'  # set to also keep prepared logos on disk
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+_lock = threading.Lock()
+_digests = {}  # (path, size, mtime) -> content hash, so unchanged files are not re-hashed
+_logos = {}  # (content hash, max_width, max_height) -> LogoAsset
+
+class LogoAsset:
+    def __init__(self, digest, data, width, height):
+        self.digest = digest
+        self.data = data  # PNG bytes of the already resized logo
+        self.width = width
+        self.height = height
+        self._reader = None
+
+    def image_reader(self):
+        # One decoded reader per process, shared by every canvas that draws this logo
+        if self._reader is None:
+            from reportlab.lib.utils import ImageReader
+            self._reader = ImageReader(io.BytesIO(self.data))
+        return self._reader
+
+    def flowable(self):
+        from reportlab.platypus import Image
+        return Image(io.BytesIO(self.data), width=self.width, height=self.height)
+
+def file_digest(path):
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    digest = _digests.get(key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        digest = _digests[key] = sha.hexdigest()
+    return digest
+
+def _resize(logo_path, max_width, max_height):
+    from PIL import Image as PILImage
+    pil_img = PILImage.open(logo_path)
+    if pil_img.mode not in ('1', 'L', 'LA', 'P', 'RGB', 'RGBA'):
+        pil_img = pil_img.convert('RGBA')  # e.g. CMYK JPEGs cannot be written as PNG
+    w, h = pil_img.size
+    scale = min(1, (max_width or w) / w, (max_height or h) / h)
+    if scale < 1:
+        pil_img = pil_img.resize((max(1, int(w * scale)), max(1, int(h * scale))), PILImage.LANCZOS)
+    buffer = io.BytesIO()
+    pil_img.save(buffer, "PNG")
+    return buffer.getvalue(), pil_img.size
+
+def _read_disk_cache(cache_file):
+    try:
+        with open(cache_file, 'rb') as f:
+            data = f.read()
+        os.utime(cache_file)  # bump for LRU eviction
+    except OSError:
+        return None
+    from PIL import Image as PILImage
+    try:
+        with PILImage.open(io.BytesIO(data)) as pil_img:
+            return data, pil_img.size
+    except Exception:
+        return None  # truncated or corrupt entry, rebuild it
+
+def write_atomic(file_path, chunks):
+    # Write the byte chunks under a unique name and rename, so concurrent workers never see a partial file
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_file = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_file, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_file, file_path)
+
+def _write_disk_cache(cache_dir, cache_file, data, max_bytes):
+    write_atomic(cache_file, [data])
+    evict_disk_cache(cache_dir, max_bytes)
+
+def evict_disk_cache(cache_dir, max_bytes=DEFAULT_CACHE_MAX_BYTES, suffix='.png'):
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(suffix):
+            try:
+                stat = os.stat(os.path.join(cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except FileNotFoundError:
+            pass  # another worker evicted it first
+        except PermissionError:
+            continue  # still mapped by a reader (Windows), it stays until a later trim
+        total -= size
+
+def load_logo(logo_path, max_width=None, max_height=None, cache_dir=None, cache_max_bytes=DEFAULT_CACHE_MAX_BYTES):
+    digest = file_digest(logo_path)
+    key = (digest, max_width, max_height)
+    with _lock:
+        logo = _logos.get(key)
+    if logo is not None:
+        return logo
+
+    cache_dir = cache_dir or os.environ.get(CACHE_DIR_ENV)
+    cached = None
+    if cache_dir:
+        cache_file = os.path.join(cache_dir, f"{digest}_{max_width or 0}x{max_height or 0}.png")
+        cached = _read_disk_cache(cache_file)
+    if cached is None:
+        cached = _resize(logo_path, max_width, max_height)
+        if cache_dir:
+            _write_disk_cache(cache_dir, cache_file, cached[0], cache_max_bytes)
+
+    data, (width, height) = cached
+    with _lock:
+        return _logos.setdefault(key, LogoAsset(digest, data, width, height))
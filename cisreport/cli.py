@@ -0,0 +1,184 @@
+import os
+import sys
+import argparse
+
+# Report modules are imported inside each command so `--help` and argument errors stay cheap
+# and a single-file run only loads what it renders with.
+
+def print_progress(progress):
+    result = progress.last
+    print(f"[{progress.completed}/{progress.total}] {result.name}: {'OK' if result.ok else 'FAILED'} "
+          f"({result.seconds:.2f}s) - {progress.throughput * 60:.1f} files/min, ETA {progress.eta:.0f}s", flush=True)
+
+def add_scan_cache_argument(parser):
+    parser.add_argument('--no-scan-cache', action='store_true',
+                        help='always reparse the CSVs instead of reusing processed scans from FOLDER/.cis_scan_cache')
+    parser.add_argument('--scan-cache-max-mb', type=float, default=None, metavar='MB',
+                        help='trim the scan cache to MB after each run (default: the size of the folder\'s CSVs, '
+                             'at least 256)')
+
+def scan_cache_options(args):
+    return {'scan_cache': not args.no_scan_cache,
+            'scan_cache_max_bytes': int(args.scan_cache_max_mb * 1024 * 1024) if args.scan_cache_max_mb else None}
+
+def add_fleet_arguments(parser, incremental=True):
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count, 1 runs in-process)')
+    parser.add_argument('--max-in-flight', type=int, default=None, help='queued jobs (default: 2x workers)')
+    if incremental:
+        parser.add_argument('--force', action='store_true', help='rebuild reports even if their inputs are unchanged')
+    parser.add_argument('--verbose', action='store_true', help='print tracebacks for failed files and skipped names')
+    parser.add_argument('--trace', default=None, metavar='FILE', help='write per-host stage timings to a JSON file')
+
+def format_list(value):
+    from .outputs import check_formats
+    try:
+        return check_formats([name.strip() for name in value.split(',') if name.strip()])
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def add_format_arguments(parser):
+    parser.add_argument('--formats', default='pdf', type=format_list,
+                        help='comma separated outputs from pdf, html, csv, jsonl (default: pdf); all but the PDF are '
+                             'written to FOLDER/exports/ (not used with --combined)')
+    parser.add_argument('--defer-pdf', action='store_true',
+                        help='write every host\'s other formats first and render the PDFs after them')
+
+def finish(summary, args):
+    print(summary.format(verbose=args.verbose))
+    if args.verbose:
+        totals = summary.stage_totals()
+        print('Stage totals: ' + ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in totals.items()))
+    if args.trace:
+        summary.write_trace(args.trace)
+    return 1 if summary.failed else 0
+
+def run_pdf(args):
+    from .narrative import generate_pdf_from_csv
+    output_path = args.output or os.path.splitext(args.csv)[0] + '.pdf'
+    generate_pdf_from_csv(args.csv, args.logo, args.title, args.footer_url, output_path, args.max_failures,
+                          max_memory_mb=args.max_memory, segment_pages=args.segment_pages)
+    print(output_path)
+    return 0
+
+def run_folder(args):
+    from .narrative import generate_folder_pdfs
+    summary = generate_folder_pdfs(args.folder, args.logo, args.footer_url, args.max_failures, args.force,
+                                   max_workers=args.workers, max_in_flight=args.max_in_flight, on_progress=print_progress)
+    return finish(summary, args)
+
+def run_compliance(args):
+    from .compliance import COMPLIANCE_MAPPING, process_folder, process_host
+    standards = args.standards.split(',') if args.standards else list(COMPLIANCE_MAPPING)
+    if os.path.isfile(args.path):
+        print(process_host(args.path, standards, args.title, args.logo, formats=args.formats))
+        return 0
+    if args.combined is not None:
+        from .combined import COMBINED_NAME, write_combined_report
+        output_path = args.combined or os.path.join(args.path, COMBINED_NAME)
+        summary = write_combined_report(args.path, standards, args.title, args.logo, output_path,
+                                        max_workers=args.workers, max_in_flight=args.max_in_flight,
+                                        on_progress=print_progress, **scan_cache_options(args))
+        if summary.succeeded and not summary.cancelled:
+            print(output_path)
+        return finish(summary, args)
+    summary = process_folder(args.path, standards, args.title, args.logo, args.workers, args.max_in_flight,
+                             on_progress=print_progress, force=args.force, formats=args.formats,
+                             defer_pdf=args.defer_pdf, **scan_cache_options(args))
+    return finish(summary, args)
+
+def run_summary(args):
+    from .compliance import COMPLIANCE_MAPPING
+    from .summary import write_fleet_summary
+    standards = args.standards.split(',') if args.standards else list(COMPLIANCE_MAPPING)
+    summary = write_fleet_summary(args.folder, standards, args.title, args.logo, args.output_dir,
+                                  max_workers=args.workers, max_in_flight=args.max_in_flight, on_progress=print_progress,
+                                  **scan_cache_options(args))
+    return finish(summary, args)
+
+def run_watch(args):
+    from .compliance import COMPLIANCE_MAPPING
+    from .watch import watch_folder
+    standards = args.standards.split(',') if args.standards else list(COMPLIANCE_MAPPING)
+
+    def print_event(event):
+        if event.kind == 'progress':
+            print(f"{event.result.name}: {'OK' if event.result.ok else 'FAILED'} ({event.result.seconds:.2f}s)", flush=True)
+        elif event.kind == 'finished':
+            batch = event.batch
+            print(batch.summary.format(verbose=args.verbose) if batch.summary else f"{batch.label}: {batch.error or batch.state}",
+                  flush=True)
+
+    print(f"Watching {args.folder} (Ctrl+C to stop)", flush=True)
+    try:
+        watch_folder(args.folder, standards, args.title, args.logo, args.settle, args.poll, args.interval,
+                     args.workers, on_event=print_event, formats=args.formats, defer_pdf=args.defer_pdf,
+                     **scan_cache_options(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cisreport', description='Generate CIS Benchmark PDF reports without a GUI.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    pdf = commands.add_parser('pdf', help='narrative report for a single CSV (pdfgen.py)')
+    pdf.add_argument('csv')
+    pdf.add_argument('-o', '--output', help='PDF path (default: next to the CSV)')
+    pdf.add_argument('--title', default='')
+    pdf.add_argument('--logo', default='')
+    pdf.add_argument('--footer-url', default='')
+    pdf.add_argument('--max-failures', type=int, default=None, help='only list the first N failures')
+    pdf.add_argument('--max-memory', type=float, default=None, metavar='MB',
+                     help='build in segments, starting a new one when the process reaches MB of resident memory')
+    pdf.add_argument('--segment-pages', type=int, default=None, metavar='N',
+                     help='build in segments of at most N pages (default with --max-memory: 250)')
+    pdf.set_defaults(handler=run_pdf)
+
+    folder = commands.add_parser('folder', help='narrative report for every CSV in a folder (bulkgen.py)')
+    folder.add_argument('folder')
+    folder.add_argument('--logo', default='')
+    folder.add_argument('--footer-url', default='')
+    folder.add_argument('--max-failures', type=int, default=30, help='only list the first N failures (default: 30, 0 lists all)')
+    add_fleet_arguments(folder)
+    folder.set_defaults(handler=run_folder)
+
+    compliance = commands.add_parser('compliance', help='compliance table and remediation file per CSV (bulkmainRem.py)')
+    compliance.add_argument('path', help='a workstation CSV or a folder of them')
+    compliance.add_argument('--standards', default='', help='comma separated compliance keys (default: all)')
+    compliance.add_argument('--title', default='')
+    compliance.add_argument('--logo', default='')
+    compliance.add_argument('--combined', nargs='?', const='', default=None, metavar='FILE',
+                            help='one PDF for the whole folder instead of one per CSV (default: FOLDER/combined_report.pdf)')
+    add_format_arguments(compliance)
+    add_fleet_arguments(compliance)
+    add_scan_cache_argument(compliance)
+    compliance.set_defaults(handler=run_compliance)
+
+    watch = commands.add_parser('watch', help='keep generating compliance reports for CSVs added to or changed in a folder')
+    watch.add_argument('folder')
+    watch.add_argument('--standards', default='', help='comma separated compliance keys (default: all)')
+    watch.add_argument('--title', default='')
+    watch.add_argument('--logo', default='')
+    watch.add_argument('--settle', type=float, default=2.0, help='seconds a CSV must stay unchanged before it is processed (default: 2)')
+    watch.add_argument('--poll', action='store_true', help='poll the folder instead of using inotify (network shares)')
+    watch.add_argument('--interval', type=float, default=1.0, help='polling interval in seconds (default: 1)')
+    watch.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count, 1 runs in-process)')
+    watch.add_argument('--verbose', action='store_true', help='print tracebacks for failed files and skipped names')
+    add_format_arguments(watch)
+    add_scan_cache_argument(watch)
+    watch.set_defaults(handler=run_watch)
+
+    summary = commands.add_parser('summary', help='one fleet-wide summary (PDF, CSV and JSON index) of every CSV in a folder')
+    summary.add_argument('folder')
+    summary.add_argument('--standards', default='', help='comma separated compliance keys (default: all)')
+    summary.add_argument('--title', default='')
+    summary.add_argument('--logo', default='')
+    summary.add_argument('--output-dir', default=None, help='default: FOLDER/fleet_summary')
+    add_fleet_arguments(summary, incremental=False)
+    add_scan_cache_argument(summary)
+    summary.set_defaults(handler=run_summary)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(sys.argv[1:] if argv is None else argv)
+    return args.handler(args)
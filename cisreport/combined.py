@@ -0,0 +1,134 @@
+import os
+from collections import namedtuple
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, PageBreak
+from xml.sax.saxutils import escape
+from .compliance import build_report, host_name, make_table_renderer, page_heights, read_host, report_document
+from .fleet import list_csv_files, run_fleet
+from .instrument import FLOWABLES, timed
+from .scancache import scan_cache_dir, trim_scan_cache
+from .streaming import StreamingStory
+from .tables import PagedTableRenderer
+
+# Every host of a folder in one compliance PDF: a contents table on the first pages, then one section per
+# host starting on its own page, each in the PDF outline. The logo and fonts are embedded once for the
+# whole fleet instead of once per host file.
+COMBINED_NAME = 'combined_report.pdf'
+CONTENTS_COLUMNS = ['Computer Name', 'Passed', 'Failed', 'Page']
+
+# What a planning worker sends back: the host's counts and how many pages its section takes
+HostPlan = namedtuple('HostPlan', ['computer_name', 'passed', 'failed', 'pages'])
+
+class SectionHeading(Paragraph):
+    # A host's heading; drawing it bookmarks the page and adds the host to the PDF outline
+    def __init__(self, text, style, key, outline_title):
+        Paragraph.__init__(self, text, style)
+        self.key = key
+        self.outline_title = outline_title
+
+    def draw(self):
+        Paragraph.draw(self)
+        self.canv.bookmarkPage(self.key)
+        self.canv.addOutlineEntry(self.outline_title, self.key, level=0)
+        self.canv.showOutline()
+
+class CombinedLayout:
+    # Styles, renderers and frame heights shared by the planning workers and the build, so the page
+    # counts the workers predict are the pages the build produces
+    def __init__(self, pdf, frame):
+        styles = getSampleStyleSheet()
+        styleN = styles['Normal']
+        styleN.alignment = 1  # Center alignment
+        self.renderer = make_table_renderer(styleN)
+        self.contents_renderer = PagedTableRenderer(
+            CONTENTS_COLUMNS, [4.5*inch, 1.5*inch, 1.5*inch, 1.5*inch], styleN,
+            base_commands=[
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('GRID', (0, 0), (-1,-1), 1, colors.black),
+                ('SIZE', (0, 0), (-1, -1), 10)
+            ]
+        )
+        self.heading_style = styles['Heading2']
+        self.width = frame._aW
+        self.first_height, self.page_height = page_heights(pdf, frame)
+
+    def heading(self, plan, key=None):
+        text = f"{escape(plan.computer_name)}: {plan.failed} failed, {plan.passed} passed"
+        return SectionHeading(text, self.heading_style, key, plan.computer_name)
+
+    def remaining(self, flowable, avail_height):
+        # Table height left below a flowable placed at the top of a frame
+        return avail_height - flowable.wrap(self.width, avail_height)[1] - flowable.getSpaceAfter()
+
+    def contents_heading(self):
+        return Paragraph('Contents', self.heading_style)
+
+    def contents_rows(self, plans, first_page):
+        page = first_page
+        for plan in plans:
+            yield plan.computer_name, plan.passed, plan.failed, page
+            page += plan.pages
+
+    def contents_pages(self, plans):
+        rows = self.contents_rows(plans, 0)
+        return self.contents_renderer.page_count(rows, self.page_height, self.remaining(self.contents_heading(), self.first_height))
+
+def plan_host(file_path, selected_standards, cache_dir=None):
+    # Runs in a worker: parse the host (filling the scan cache the build reads from) and count its pages
+    records = read_host(file_path, selected_standards, cache_dir=cache_dir)
+    layout = CombinedLayout(*report_document(os.devnull))
+    passed = sum(1 for status in records.status if status == 'PASSED')
+    plan = HostPlan(host_name(file_path), passed, len(records) - passed, 0)
+    first_height = layout.remaining(layout.heading(plan), layout.page_height)
+    pages = layout.renderer.page_count(records.table_rows(), layout.page_height, first_height)
+    return plan._replace(pages=pages)
+
+def iter_combined_story(layout, hosts, selected_standards, cache_dir=None):
+    # hosts is [(file_path, HostPlan)]; each host is read again (from the scan cache) only when reportlab
+    # reaches its section, so one host's records and tables are in memory at a time
+    plans = [plan for _, plan in hosts]
+    heading = layout.contents_heading()
+    yield heading
+    yield from layout.contents_renderer.tables(
+        layout.contents_rows(plans, layout.contents_pages(plans) + 1),
+        layout.page_height, layout.remaining(heading, layout.first_height))
+    for index, (file_path, plan) in enumerate(hosts):
+        records = read_host(file_path, selected_standards, cache_dir=cache_dir)
+        heading = layout.heading(plan, key=f"host-{index}")
+        yield PageBreak()
+        yield heading
+        tables = layout.renderer.tables(records.table_rows(), layout.page_height, layout.remaining(heading, layout.page_height))
+        yield from timed(tables, FLOWABLES)
+
+def write_combined_report(folder_path, selected_standards, document_title='', logo_path='', output_path=None,
+                          scan_cache=True, generated=None, scan_cache_max_bytes=None, **fleet_options):
+    # Hosts are parsed and paginated across the worker pool first, then streamed into one PDF (default:
+    # FOLDER/combined_report.pdf). Hosts whose CSV fails are left out and reported in the summary. The
+    # scan cache is only trimmed after the build, so the second read of every host is a cache hit.
+    cache_dir = scan_cache_dir(folder_path) if scan_cache else None
+    output_path = output_path or os.path.join(folder_path, COMBINED_NAME)
+    jobs = [
+        (file_name, (os.path.join(folder_path, file_name), selected_standards, cache_dir))
+        for file_name in list_csv_files(folder_path)
+    ]
+    try:
+        summary = run_fleet(jobs, plan_host, **fleet_options)
+        control = fleet_options.get('control')
+        if summary.cancelled or (control and control.cancelled):
+            return summary
+        plans = {result.name: result.value for result in summary.succeeded}
+        hosts = [(args[0], plans[name]) for name, args in jobs if name in plans]
+        if hosts:
+            pdf, frame = report_document(output_path, document_title, logo_path, generated)
+            layout = CombinedLayout(pdf, frame)
+            build_report(pdf, StreamingStory(iter_combined_story(layout, hosts, selected_standards, cache_dir)))
+    finally:
+        if cache_dir:
+            trim_scan_cache(cache_dir, folder_path, scan_cache_max_bytes)
+    return summary
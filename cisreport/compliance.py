@@ -0,0 +1,432 @@
+import os
+from collections import namedtuple
+from datetime import datetime
+from operator import attrgetter
+import numpy as np
+import pandas as pd
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.platypus import SimpleDocTemplate, PageTemplate, Frame
+from reportlab.lib.units import inch
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfgen.canvas import Canvas
+from .assets import file_digest, load_logo, LOGO_MAX_HEIGHT
+from .fleet import FleetSummary, list_csv_files
+from .instrument import (CACHE_READ, CSV_READ, COMPLIANCE_PARSE, EXPORT_WRITE, FLOWABLES, REPORTLAB_BUILD, REMEDIATION_WRITE,
+                         stage, timed)
+from .manifest import run_incremental
+from .outputs import DEFAULT_FORMATS, PDF, check_formats, open_row_outputs
+from .parsing import parse_compliance, standard_index
+from .remediation import RemediationBase, fleet_file_path, host_view_path, write_host_view
+from .scancache import open_scan, scan_cache_dir, scan_cache_file, trim_scan_cache, write_scan
+from .tables import PagedTableRenderer
+
+COMPLIANCE_MAPPING = {
+    'hipaa': 'HIPAA',
+    'nist_800_53': 'NIST',
+    'pci_dss': 'PCI DSS',
+    'gdpr_IV': 'GDPR'
+}
+
+CSV_COLUMNS = ['Title', 'Compliance', 'Result', 'Remediation']
+PROCESSED_COLUMNS = [
+    'Computer Name', 'Rule Information', 'Compliance Standard',
+    'Compliance Rule', 'Status', 'Remediation'
+]
+TABLE_COLUMNS = PROCESSED_COLUMNS[:-1]  # everything but Remediation goes in the PDF table
+DEFAULT_CHUNKSIZE = 10000  # CSV rows held in memory at once
+DEFERRED_MANIFEST_NAME = '.cis_report_manifest_pdf.json'  # the PDFs of process_folder(defer_pdf=True)
+
+# What a process_folder worker sends back: files to track in the manifest, and the host's failed rules as
+# (rule information, remediation, ((standard, rule), ...)) for the fleet remediation index
+HostBuild = namedtuple('HostBuild', ['outputs', 'computer_name', 'failures'])
+
+class HostRecords:
+    # One host's processed rows as plain column lists, filled straight from the exploded CSV chunks.
+    # A single traversal feeds the PDF table (and its status colours) and the remediation writer,
+    # instead of copying a DataFrame for the table and walking it again with iterrows().
+    __slots__ = ('computer_name', 'rule_information', 'standard', 'rule', 'status', 'remediation')
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, [])
+
+    @classmethod
+    def from_frame(cls, data):
+        # data has PROCESSED_COLUMNS, as returned by process_csv
+        records = cls()
+        for name, column in zip(cls.__slots__, PROCESSED_COLUMNS):
+            setattr(records, name, data[column].tolist())
+        return records
+
+    def extend(self, computer_name, columns):
+        # columns is an explode_columns() result; the name is one shared string, not a copy per row
+        self.computer_name.extend([computer_name] * len(columns['Status']))
+        for name, column in zip(self.__slots__[1:], PROCESSED_COLUMNS[1:]):
+            getattr(self, name).extend(columns[column])
+
+    def __len__(self):
+        return len(self.status)
+
+    def table_rows(self):
+        return zip(self.computer_name, self.rule_information, self.standard, self.rule, self.status)
+
+    def traverse(self, on_failed=None, on_row=None):
+        # Yields the table rows, passing each FAILED row and its remediation to on_failed, and every row and
+        # its remediation to on_row (the row outputs), on the way
+        if on_failed is None and on_row is None:
+            yield from self.table_rows()
+            return
+        for row, remediation in zip(self.table_rows(), self.remediation):
+            if on_row is not None:
+                on_row(row, remediation)
+            if on_failed is not None and row[4] == 'FAILED':
+                on_failed(row, remediation)
+            yield row
+
+    def failed(self):
+        return ((row, remediation) for row, remediation in zip(self.table_rows(), self.remediation) if row[4] == 'FAILED')
+
+def as_records(data):
+    return data if isinstance(data, HostRecords) else HostRecords.from_frame(data)
+
+class NumberedCanvas(Canvas):
+    # Every page gets the footer (URL, generation time and page number), the first page the header (logo
+    # and title). The footer text is formatted once per document, only the page number changes.
+    def __init__(self, *args, leftMargin=0, rightMargin=0, bottomMargin=0, _pdf=None, **kwargs):
+        Canvas.__init__(self, *args, **kwargs)
+        self._pdf = _pdf  # store the pdf object as an instance variable
+        self._leftMargin = leftMargin
+        self._rightMargin = rightMargin
+        self._bottomMargin = bottomMargin
+        self._pageNumber = 1  # initialize the page number (Canvas.showPage advances it)
+        self._footer_text = f'https://cns4u.com - Report generated on {_pdf.date.strftime("%m-%d-%Y at %H:%M")}'
+
+    def showPage(self):
+        # Draw static and dynamic footer elements
+        self._draw_static_footer()
+        self._draw_dynamic_footer()
+        # Draw header for the first page
+        if self._pageNumber == 1:
+            self._draw_header()
+        # Show the page
+        Canvas.showPage(self)
+
+    def _draw_static_footer(self):
+        self.setFont('Helvetica', 10)
+        self.drawString(self._leftMargin, self._bottomMargin - 30, self._footer_text)
+
+    def _draw_dynamic_footer(self):
+        # Reset the font settings to ensure consistent appearance
+        self.setFont('Helvetica', 10)
+        page_number_text = f'Page {self._pageNumber}'
+        self.drawRightString(self._pagesize[0] - self._rightMargin, self._bottomMargin - 30, page_number_text)
+
+    def _draw_header(self):
+        logo = self._pdf.logo
+        width, height = (logo.width, logo.height) if logo else (0, 0)
+        if logo:
+            self.drawImage(logo.image_reader(), self._leftMargin, self._pagesize[1] - height, width=width, height=height)
+        title_width = self.stringWidth(self._pdf.title, 'Helvetica-Bold', 24)
+        title_x = self._leftMargin + width + ((self._pagesize[0] - self._leftMargin - width - title_width) / 2)
+        self.setFont('Helvetica-Bold', 24)
+        self.drawString(title_x, self._pagesize[1] - height/2 - 12, self._pdf.title)  # Adjust y position
+
+def make_table_renderer(style):
+    col_widths = [1.5*inch, 2.5*inch, 2*inch, 2*inch, 1*inch]  # Adjust column widths
+    return PagedTableRenderer(
+        TABLE_COLUMNS, col_widths, style,
+        base_commands=[
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1,-1), 1, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('SIZE', (0, 0), (-1, -1), 10)
+        ],
+        status_column=TABLE_COLUMNS.index('Status'),
+        status_colors={'PASSED': colors.green},
+        default_status_color=colors.red
+    )
+
+def report_document(file_name, document_title='', logo_path='', generated=None):
+    # The landscape document every compliance report is built on: the first page's content frame leaves room
+    # for the header NumberedCanvas draws there. Returns the template and the first page's frame.
+    pdf = SimpleDocTemplate(file_name, pagesize=landscape(letter))
+
+    # resized once per process and shared by every report, limited to a height of 150
+    pdf.logo = load_logo(logo_path, max_height=LOGO_MAX_HEIGHT) if logo_path else None
+    pdf.title = document_title  # assign string value to pdf.title
+    pdf.date = generated or datetime.now()
+
+    frame = Frame(
+        pdf.leftMargin, pdf.bottomMargin + 1.5 * inch, pdf.width, pdf.height - 2.5 * inch,
+        id='content_frame', showBoundary=0  # hide frame border
+    )
+    
+    main_page_template = PageTemplate(
+        id='MainTemplate',
+        frames=[frame]
+    )
+
+    pdf.addPageTemplates([main_page_template])
+    return pdf, frame
+
+def page_heights(pdf, frame):
+    # Usable table height on the first page and on later pages. Only the first page uses content_frame;
+    # SimpleDocTemplate's own full-height frame takes over after it. Heights are inside the frames' 6pt
+    # padding, less 1pt of slack for rounding.
+    return frame._aH - 1, pdf.height - 13
+
+def build_report(pdf, story):
+    with stage(REPORTLAB_BUILD):
+        pdf.build(story, canvasmaker=lambda *args, **kwargs: NumberedCanvas(
+            *args, 
+            leftMargin=pdf.leftMargin, 
+            rightMargin=pdf.rightMargin, 
+            bottomMargin=pdf.bottomMargin,
+            _pdf=pdf,  # pass the pdf object to the canvas class
+            **{k: v for k, v in kwargs.items() if k != '_pdf'}  # filter out the _pdf keyword argument
+        ))
+
+def generate_pdf(data, document_title='', logo_path='', file_name='report.pdf', on_failed=None, generated=None,
+                 on_row=None):
+    # data is a process_csv() DataFrame or HostRecords; on_failed(row, remediation) sees every FAILED row and
+    # on_row(row, remediation) every row while the table is laid out, so build_host collects the remediation
+    # file and writes the row outputs in the same pass. generated is the time printed in the footer, one per
+    # run for folder runs (default: now).
+    records = as_records(data)
+    pdf, frame = report_document(file_name, document_title, logo_path, generated)
+    styles = getSampleStyleSheet()
+    styleN = styles['Normal']
+    styleN.alignment = 1  # Center alignment
+
+    renderer = make_table_renderer(styleN)
+    first_height, page_height = page_heights(pdf, frame)
+    rows = records.traverse(on_failed, on_row)
+    with stage(FLOWABLES):
+        tables = list(renderer.tables(rows, page_height, first_avail_height=first_height))
+    build_report(pdf, tables)
+
+def generate_remediation_file(data, document_title, folder_path):
+    # Everything in data in one file; bulk runs write per-host views and a fleet file instead (see process_folder)
+    with open(fleet_file_path(document_title, folder_path), 'w') as file:
+        for row, remediation in as_records(data).failed():
+            file.write(f"Compliance Standard: {row[2]}\n")
+            file.write(f"Rule Information: {row[1]}\n")
+            file.write(f"Remediation: {remediation}\n")
+            file.write('-' * 80 + '\n')
+
+def build_host(file_path, selected_standards, document_title='', logo_path='', cache_dir=None, generated=None,
+               formats=DEFAULT_FORMATS):
+    # formats picks the outputs (see outputs.py). One traversal of the records lays out the PDF table,
+    # writes the row outputs and collects the failed rules for HOST_Remediation.txt.
+    records = read_host(file_path, selected_standards, cache_dir=cache_dir)
+    computer_name = host_name(file_path)
+    failed_rules = {}
+
+    def on_failed(row, remediation):
+        # a rule fails once per compliance item it maps to; its remediation is listed once
+        failed_rules.setdefault((row[1], remediation), {})[(row[2], row[3])] = None
+
+    exports = open_row_outputs(file_path, formats, computer_name, document_title, generated)
+    on_row = exports.write if exports else None
+    outputs = []
+    try:
+        if PDF in formats:
+            outputs.append(render_host_pdf(file_path, records, document_title, logo_path, generated, on_failed, on_row))
+        else:
+            with stage(EXPORT_WRITE):
+                for _ in records.traverse(on_failed, on_row):
+                    pass
+    finally:
+        if exports:
+            exports.close()
+    failures = [(rule, remediation, tuple(standards)) for (rule, remediation), standards in failed_rules.items()]
+    view_path = host_view_path(file_path)
+    with stage(REMEDIATION_WRITE):
+        write_host_view(view_path, failures)
+    outputs.extend((exports.paths if exports else []) + [view_path])
+    return HostBuild(outputs, computer_name, failures)
+
+def render_host_pdf(file_path, records, document_title='', logo_path='', generated=None, on_failed=None, on_row=None):
+    pdf_file_path = os.path.splitext(file_path)[0] + '.pdf'
+    generate_pdf(records, document_title, logo_path, pdf_file_path, on_failed, generated, on_row)
+    return pdf_file_path
+
+def build_host_pdf(file_path, selected_standards, document_title='', logo_path='', cache_dir=None, generated=None):
+    # The deferred PDF pass of process_folder: the host's scan is read back from the scan cache, if any
+    records = read_host(file_path, selected_standards, cache_dir=cache_dir)
+    return render_host_pdf(file_path, records, document_title, logo_path, generated)
+
+def process_host(file_path, selected_standards, document_title='', logo_path='', cache_dir=None, formats=DEFAULT_FORMATS):
+    # Writes HOST.pdf and HOST_Remediation.txt next to the CSV, and any other formats to exports/; returns
+    # the PDF path (the first export's without one)
+    formats = check_formats(formats)
+    return build_host(file_path, selected_standards, document_title, logo_path, cache_dir, formats=formats).outputs[0]
+
+def process_folder(folder_path, selected_standards, document_title='', logo_path='',
+                   max_workers=None, max_in_flight=None, on_result=None, force=False, scan_cache=True, only=None,
+                   formats=DEFAULT_FORMATS, defer_pdf=False, scan_cache_max_bytes=None, **fleet_options):
+    # scan_cache keeps processed CSVs in scan_cache_dir(folder_path), trimmed to scan_cache_max_bytes (default:
+    # scaled to the folder) after the run, see scancache.py. only limits the run to those CSV names (the
+    # watch daemon's settled files); the other hosts stay in the indexes. formats picks the outputs (see
+    # outputs.py). With defer_pdf every host's other outputs and remediation files
+    # are written first and the PDFs after them, in a second pass tracked in its own manifest.
+    formats = check_formats(formats)
+    deferred = defer_pdf and PDF in formats and len(formats) > 1
+    if deferred:
+        formats = tuple(name for name in formats if name != PDF)
+    cache_dir = scan_cache_dir(folder_path) if scan_cache else None
+    generated = datetime.now()
+    names = list_csv_files(folder_path)
+    jobs = [
+        (file_name, (os.path.join(folder_path, file_name), selected_standards, document_title, logo_path, cache_dir, generated))
+        for file_name in names if only is None or file_name in only
+    ]
+    settings = {
+        'report': 'compliance_table',
+        'title': document_title,
+        'standards': sorted(selected_standards),
+        'logo': file_digest(logo_path) if logo_path else ''
+    }
+    remediations = RemediationBase(folder_path)
+    remediations.prune(names)
+
+    def merge(result, completed):
+        # fold each host into the fleet remediation index as soon as it finishes
+        if result.ok:
+            remediations.set_host(result.name, result.value.computer_name, result.value.failures)
+        else:
+            remediations.remove_host(result.name)
+        if on_result:
+            on_result(result, completed)
+
+    try:
+        summary = run_incremental(folder_path, [(name, args + (formats,)) for name, args in jobs], build_host,
+                                  dict(settings, formats=sorted(formats)), force,
+                                  rebuild=[name for name, _ in jobs if name not in remediations.hosts], names=names,
+                                  outputs=attrgetter('outputs'), max_workers=max_workers, max_in_flight=max_in_flight,
+                                  on_result=merge, **fleet_options)
+    finally:
+        remediations.prune(names)
+        remediations.save()
+        remediations.write_fleet_file(fleet_file_path(document_title, folder_path), document_title)
+    control = fleet_options.get('control')
+    try:
+        if not deferred or (control and control.cancelled):
+            return summary
+        # the second pass names its hosts after their PDF, in its events and summary alike, so each host
+        # reads once per pass and its progress does not look like the first pass starting over
+        pdf_options = dict(fleet_options)
+        if on_result:
+            pdf_options['on_result'] = lambda result, completed: on_result(result._replace(name=pdf_name(result.name)), completed)
+        if fleet_options.get('on_progress'):
+            def on_pdf_progress(progress):
+                progress.last = progress.last._replace(name=pdf_name(progress.last.name))
+                fleet_options['on_progress'](progress)
+            pdf_options['on_progress'] = on_pdf_progress
+        pdfs = run_incremental(folder_path, jobs, build_host_pdf, dict(settings, formats=[PDF]), force, names=names,
+                               manifest_name=DEFERRED_MANIFEST_NAME, max_workers=max_workers, max_in_flight=max_in_flight,
+                               **pdf_options)
+    finally:
+        if cache_dir:
+            trim_scan_cache(cache_dir, folder_path, scan_cache_max_bytes)
+    results = summary.results + [result._replace(name=pdf_name(result.name)) for result in pdfs.results]
+    return FleetSummary(results, summary.wall_time + pdfs.wall_time, summary.skipped + [pdf_name(name) for name in pdfs.skipped],
+                        summary.cancelled + [pdf_name(name) for name in pdfs.cancelled])
+
+def pdf_name(name):
+    return os.path.splitext(name)[0] + '.pdf'
+
+def explode_columns(chunk, selected_standards):
+    # Returns PROCESSED_COLUMNS but Computer Name as lists, one entry per selected compliance item
+    # (per item of every standard if selected_standards is None)
+    status = chunk['Result'].fillna('').str.upper()
+    applicable = status.str.strip() != 'NOT APPLICABLE'
+    chunk, status = chunk[applicable], status[applicable]
+
+    # Parse and filter each distinct Compliance value once, then broadcast back to the rows
+    codes, uniques = pd.factorize(chunk['Compliance'].fillna('[]'))
+    parsed = [parse_compliance(compliance) for compliance in uniques]
+    if selected_standards is None:
+        selected_standards = {key for items in parsed for key, _ in items}
+    index = standard_index(selected_standards, COMPLIANCE_MAPPING)
+    selected_items = [tuple((index[key], value) for key, value in items if key in index) for items in parsed]
+    items = pd.Series(selected_items, dtype=object).take(codes)
+    items.index = chunk.index
+    items = items.explode().dropna()
+
+    rows = chunk.loc[items.index]
+    return {
+        'Rule Information': rows['Title'].fillna('').tolist(),
+        'Compliance Standard': [item[0] for item in items],
+        'Compliance Rule': [item[1] for item in items],
+        'Status': status.loc[items.index].tolist(),
+        'Remediation': rows['Remediation'].fillna('').tolist()
+    }
+
+def host_name(file_path):
+    return os.path.basename(file_path).split('.')[0]
+
+def iter_explode(file_path, selected_standards, chunksize=DEFAULT_CHUNKSIZE):
+    with pd.read_csv(file_path, usecols=CSV_COLUMNS, dtype=str, chunksize=chunksize) as reader:
+        for chunk in timed(reader, CSV_READ):
+            with stage(COMPLIANCE_PARSE):
+                columns = explode_columns(chunk, selected_standards)
+            yield columns
+
+def iter_process_csv(file_path, selected_standards, chunksize=DEFAULT_CHUNKSIZE):
+    computer_name = host_name(file_path)
+    for columns in iter_explode(file_path, selected_standards, chunksize):
+        with stage(COMPLIANCE_PARSE):
+            frame = pd.DataFrame(dict(columns, **{'Computer Name': computer_name}), columns=PROCESSED_COLUMNS)
+        yield frame
+
+def read_host(file_path, selected_standards, chunksize=DEFAULT_CHUNKSIZE, cache_dir=None):
+    # process_csv without the DataFrame: what process_host renders from. With a cache_dir the processed
+    # scan (for every standard) is kept there by CSV hash and later calls only filter and decode it.
+    records = HostRecords()
+    computer_name = host_name(file_path)
+    if cache_dir:
+        cache_file = scan_cache_file(cache_dir, file_digest(file_path))
+        scan = open_scan(cache_file)
+        if scan is None:
+            columns = {column: [] for column in PROCESSED_COLUMNS[1:]}
+            for chunk_columns in iter_explode(file_path, None, chunksize):
+                for column, values in chunk_columns.items():
+                    columns[column].extend(values)
+            write_scan(cache_file, columns)
+            scan = open_scan(cache_file)
+            if scan is None:  # evicted by another run's trim before it could be opened
+                records.extend(computer_name, select_columns(columns, selected_standards))
+                return records
+        with stage(CACHE_READ):
+            records.extend(computer_name, select_standards(scan, selected_standards))
+        return records
+    for columns in iter_explode(file_path, selected_standards, chunksize):
+        records.extend(computer_name, columns)
+    return records
+
+def select_standards(scan, selected_standards):
+    # Rows of a cached scan that belong to the selected standards, decoded to explode_columns() lists
+    wanted = {COMPLIANCE_MAPPING.get(key, key) for key in selected_standards}
+    codes = [code for code, standard in enumerate(scan.dictionary('Compliance Standard')) if standard in wanted]
+    index = np.flatnonzero(np.isin(scan.codes('Compliance Standard'), codes))
+    return {column: scan.take(column, index) for column in PROCESSED_COLUMNS[1:]}
+
+def select_columns(columns, selected_standards):
+    # select_standards for a scan still in memory, as read_host collects it
+    wanted = {COMPLIANCE_MAPPING.get(key, key) for key in selected_standards}
+    index = [i for i, standard in enumerate(columns['Compliance Standard']) if standard in wanted]
+    return {column: [values[i] for i in index] for column, values in columns.items()}
+
+def process_csv(file_path, selected_standards, chunksize=DEFAULT_CHUNKSIZE):
+    frames = [frame for frame in iter_process_csv(file_path, selected_standards, chunksize) if len(frame)]
+    if not frames:
+        return pd.DataFrame(columns=PROCESSED_COLUMNS)
+    with stage(COMPLIANCE_PARSE):
+        return pd.concat(frames, ignore_index=True)
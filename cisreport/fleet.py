@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import threading
+import traceback
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from .instrument import Progress, tracing
+
+# stages maps stage name to seconds spent in it (see instrument.py)
+JobResult = namedtuple('JobResult', ['name', 'ok', 'error', 'seconds', 'value', 'stages'])
+
+CONTROL_POLL_SECONDS = 0.2
+
+def list_csv_files(folder_path):
+    return sorted(f for f in os.listdir(folder_path) if f.endswith('.csv'))
+
+def _timed_call(worker, name, args):
+    # Runs inside the worker process so one bad CSV only fails its own job
+    start = time.perf_counter()
+    with tracing() as trace:
+        try:
+            value = worker(*args)
+            return JobResult(name, True, None, time.perf_counter() - start, value, trace.stages)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}\n{traceback.format_exc()}"
+            return JobResult(name, False, error, time.perf_counter() - start, None, trace.stages)
+
+class RunControl:
+    # Lets another thread (e.g. a GUI) pause, resume or cancel a run_fleet between jobs.
+    # Jobs already handed to a worker always finish; cancelling only drops the ones not started.
+    def __init__(self):
+        self._running = threading.Event()
+        self._running.set()
+        self.cancelled = False
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def cancel(self):
+        self.cancelled = True
+        self._running.set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def holding(self):
+        return self.paused or self.cancelled
+
+    def wait(self, timeout=None):
+        # Blocks while paused; returns False if still paused after timeout
+        return self._running.wait(timeout)
+
+def run_fleet(jobs, worker, max_workers=None, max_in_flight=None, on_result=None, on_progress=None,
+              control=None, executor=None):
+    # jobs is a sequence of (name, args) tuples; worker must be a module-level function so it can be pickled.
+    # on_result(result, completed) and on_progress(progress) are called in this process as each job finishes.
+    # executor is an already running pool to use (and leave running) instead of starting one for this run.
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = max(max_in_flight or 2 * max_workers, 1)
+    jobs = list(jobs)
+    progress = Progress(len(jobs))
+    results = []
+    start = time.perf_counter()
+
+    def collect(result):
+        results.append(result)
+        progress.update(result)
+        if on_result:
+            on_result(result, len(results))
+        if on_progress:
+            on_progress(progress)
+
+    if max_workers == 1 and executor is None:
+        for index, (name, args) in enumerate(jobs):
+            if control:
+                control.wait()
+                if control.cancelled:
+                    return FleetSummary(results, time.perf_counter() - start, cancelled=[n for n, _ in jobs[index:]])
+            collect(_timed_call(worker, name, args))
+        return FleetSummary(results, time.perf_counter() - start)
+
+    queued = deque(jobs)
+    if executor is None:
+        while True:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                dropped, broken = _run_pool(pool, queued, worker, max_in_flight, collect, control)
+            # a worker process died: the jobs in flight with it have failed, the rest get a fresh pool
+            if not (broken and queued and not (control and control.cancelled)):
+                break
+    else:
+        dropped, broken = _run_pool(executor, queued, worker, max_in_flight, collect, control)
+        if broken and not (control and control.cancelled):
+            # the pool belongs to the caller, who replaces it; the jobs it can no longer start fail here
+            while queued:
+                name, _ = queued.popleft()
+                collect(JobResult(name, False, 'BrokenProcessPool: not started, a worker process died', 0.0, None, {}))
+    return FleetSummary(results, time.perf_counter() - start, cancelled=dropped + [name for name, _ in queued])
+
+def _run_pool(executor, queued, worker, max_in_flight, collect, control):
+    # Takes jobs off the queued deque until it is empty, the run is cancelled or the pool breaks.
+    # Returns the names of the jobs dropped by control.cancel() and whether the pool broke; jobs not
+    # started are left in queued.
+    pending = {}
+    dropped = []
+    broken = False
+
+    def fill():
+        nonlocal broken
+        while not broken and queued and len(pending) < max_in_flight and not (control and control.holding()):
+            name, args = queued[0]
+            try:
+                future = executor.submit(_timed_call, worker, name, args)
+            except BrokenProcessPool:
+                broken = True
+                return
+            queued.popleft()
+            pending[future] = name
+
+    fill()
+    while pending or (queued and not broken and control and not control.cancelled):
+        if not pending:
+            control.wait()  # paused with nothing in flight
+            fill()
+            continue
+        # with a control, wake up now and then so pause/resume/cancel take effect between completions
+        done, _ = wait(pending, timeout=CONTROL_POLL_SECONDS if control else None, return_when=FIRST_COMPLETED)
+        if control and control.cancelled:
+            for future in [f for f in pending if f not in done and f.cancel()]:
+                dropped.append(pending.pop(future))
+        for future in done:
+            name = pending.pop(future)
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:  # a worker process died, taking every job in flight with it
+                broken = True
+                result = JobResult(name, False, f"BrokenProcessPool: {e}", 0.0, None, {})
+            except Exception as e:
+                result = JobResult(name, False, f"{type(e).__name__}: {e}", 0.0, None, {})
+            collect(result)
+        fill()
+    return dropped, broken
+
+class FleetSummary:
+    def __init__(self, results, wall_time, skipped=(), cancelled=()):
+        self.results = results
+        self.wall_time = wall_time
+        self.skipped = list(skipped)  # names left alone because their outputs were up to date
+        self.cancelled = list(cancelled)  # names never started because the run was cancelled
+
+    @property
+    def succeeded(self):
+        return [r for r in self.results if r.ok]
+
+    @property
+    def failed(self):
+        return [r for r in self.results if not r.ok]
+
+    def format(self, verbose=False):
+        lines = [f"{r.name}: {'OK' if r.ok else 'FAILED'} ({r.seconds:.2f}s)" for r in sorted(self.results)]
+        if verbose:
+            lines.extend(f"\n{r.name}:\n{r.error}" for r in self.failed)
+        if verbose and self.skipped:
+            lines.append(f"Skipped (unchanged): {', '.join(self.skipped)}")
+        if verbose and self.cancelled:
+            lines.append(f"Cancelled: {', '.join(self.cancelled)}")
+        cancelled = f", {len(self.cancelled)} cancelled" if self.cancelled else ''
+        lines.append(f"{len(self.succeeded)} succeeded, {len(self.failed)} failed, {len(self.skipped)} skipped{cancelled} in {self.wall_time:.2f}s")
+        return '\n'.join(lines)
+
+    def stage_totals(self):
+        totals = {}
+        for result in self.results:
+            for stage, seconds in result.stages.items():
+                totals[stage] = totals.get(stage, 0.0) + seconds
+        return totals
+
+    def trace(self):
+        # Slowest hosts first, for post-mortems of long runs
+        return {
+            'wall_time': self.wall_time,
+            'stage_totals': self.stage_totals(),
+            'skipped': self.skipped,
+            'jobs': [
+                {'name': r.name, 'ok': r.ok, 'seconds': r.seconds, 'stages': r.stages, 'error': r.error}
+                for r in sorted(self.results, key=lambda r: r.seconds, reverse=True)
+            ]
+        }
+
+    def write_trace(self, file_path):
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.trace(), f, indent=1)
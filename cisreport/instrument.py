@@ -0,0 +1,106 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+# Stage names recorded per host
+CSV_READ = 'csv_read'
+CACHE_READ = 'cache_read'  # filtering and decoding a cached scan instead of CSV_READ + COMPLIANCE_PARSE
+COMPLIANCE_PARSE = 'compliance_parse'
+FLOWABLES = 'flowables'
+REPORTLAB_BUILD = 'reportlab_build'
+REMEDIATION_WRITE = 'remediation_write'
+EXPORT_WRITE = 'export_write'  # export-only runs; written alongside a PDF, the row outputs count in FLOWABLES
+
+_local = threading.local()
+
+class Trace:
+    # Exclusive time per stage for one job: time spent in a nested stage (e.g. the CSV reads pulled
+    # while reportlab builds a streamed story) is not counted again in the enclosing stage
+    def __init__(self):
+        self.stages = {}
+        self._stack = []
+
+    def _enter(self):
+        self._stack.append(0.0)
+
+    def _exit(self, name, elapsed):
+        nested = self._stack.pop()
+        self.stages[name] = self.stages.get(name, 0.0) + elapsed - nested
+        if self._stack:
+            self._stack[-1] += elapsed
+
+@contextmanager
+def tracing():
+    # Record the stages of everything run inside the block on this thread
+    previous = getattr(_local, 'trace', None)
+    trace = _local.trace = Trace()
+    try:
+        yield trace
+    finally:
+        _local.trace = previous
+
+@contextmanager
+def stage(name):
+    trace = getattr(_local, 'trace', None)
+    if trace is None:
+        yield
+        return
+    trace._enter()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace._exit(name, time.perf_counter() - start)
+
+def timed(iterable, name):
+    # Iterate while attributing the time spent producing each item to a stage
+    iterator = iter(iterable)
+    while True:
+        with stage(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+class Progress:
+    def __init__(self, total):
+        self.total = total
+        self.completed = 0
+        self.failed = 0
+        self.last = None
+        self.start = time.perf_counter()
+
+    def update(self, result):
+        self.completed += 1
+        self.failed += not result.ok
+        self.last = result
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    @property
+    def throughput(self):
+        return self.completed / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def eta(self):
+        if not self.completed:
+            return None
+        return (self.total - self.completed) / self.throughput
+
+    def format(self):
+        eta = 'unknown' if self.eta is None else f"{self.eta:.0f}s"
+        return (f"{self.completed}/{self.total} files ({self.failed} failed), "
+                f"{self.throughput * 60:.1f} files/min, ETA {eta}")
+
+def current_rss_mb():
+    # Resident set size of this process right now, or None where /proc is not available
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
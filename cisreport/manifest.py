@@ -0,0 +1,98 @@
+import os
+import json
+import hashlib
+from .assets import file_digest
+from .fleet import run_fleet
+
+MANIFEST_NAME = '.cis_report_manifest.json'
+MANIFEST_VERSION = 1
+
+def settings_digest(settings):
+    encoded = json.dumps(settings, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+class Manifest:
+    # Per-folder index of input CSV hash + settings hash -> output hashes from the last successful build
+    def __init__(self, folder_path, manifest_name=MANIFEST_NAME):
+        self.path = os.path.join(folder_path, manifest_name)
+        self.entries = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('version') == MANIFEST_VERSION:
+                self.entries = saved.get('entries', {})
+        except (OSError, ValueError):
+            pass  # missing or unreadable manifest, rebuild everything
+
+    def is_current(self, name, input_digest, settings_hash):
+        entry = self.entries.get(name)
+        if not entry or entry['input'] != input_digest or entry['settings'] != settings_hash:
+            return False
+        for output_path, output_digest in entry['outputs'].items():
+            try:
+                if file_digest(output_path) != output_digest:
+                    return False
+            except OSError:
+                return False  # output was deleted
+        return True
+
+    def record(self, name, input_digest, settings_hash, outputs):
+        if isinstance(outputs, str):
+            outputs = [outputs]
+        self.entries[name] = {
+            'input': input_digest,
+            'settings': settings_hash,
+            'outputs': {path: file_digest(path) for path in outputs or []}
+        }
+
+    def prune(self, names):
+        names = set(names)
+        for name in list(self.entries):
+            if name not in names:
+                del self.entries[name]
+
+    def save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'entries': self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+def run_incremental(folder_path, jobs, worker, settings, force=False, rebuild=(), outputs=None, names=None,
+                    manifest_name=MANIFEST_NAME, **fleet_options):
+    # Like run_fleet, but skips CSVs whose content, settings and outputs match the folder manifest.
+    # rebuild names jobs to run regardless; outputs(value) picks the output paths out of a worker's
+    # return value when it returns more than those. names lists every CSV still in the folder when
+    # jobs only covers some of them, so the others keep their manifest entries. A second pass over the same
+    # CSVs (process_folder's deferred PDFs) keeps its own manifest_name.
+    manifest = Manifest(folder_path, manifest_name)
+    settings_hash = settings_digest(settings)
+    jobs = list(jobs)
+    manifest.prune(names if names is not None else (name for name, _ in jobs))
+
+    rebuild = set(rebuild)
+    pending, skipped, input_digests = [], [], {}
+    for name, args in jobs:
+        input_digest = file_digest(os.path.join(folder_path, name))
+        if not force and name not in rebuild and manifest.is_current(name, input_digest, settings_hash):
+            skipped.append(name)
+            continue
+        input_digests[name] = input_digest
+        pending.append((name, args))
+
+    on_result = fleet_options.pop('on_result', None)
+
+    def record(result, completed):
+        if result.ok:
+            value = outputs(result.value) if outputs else result.value
+            manifest.record(result.name, input_digests[result.name], settings_hash, value)
+        else:
+            manifest.entries.pop(result.name, None)
+        if on_result:
+            on_result(result, completed)
+
+    try:
+        summary = run_fleet(pending, worker, on_result=record, **fleet_options)
+    finally:
+        manifest.save()  # keep what was built even if the run is interrupted
+    summary.skipped = skipped
+    return summary
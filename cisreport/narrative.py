@@ -0,0 +1,103 @@
+import os
+import csv
+from datetime import datetime
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from .assets import file_digest, load_logo, LOGO_MAX_WIDTH
+from .fleet import list_csv_files
+from .instrument import CSV_READ, FLOWABLES, REPORTLAB_BUILD, stage, timed
+from .manifest import run_incremental
+from .streaming import StreamingStory, build_segmented
+
+BULK_MAX_FAILURES = 30  # default cap for bulk reports; None or 0 lists every failure
+SEGMENT_PAGES = 250  # pages per segment for memory-bounded builds, about 10 MB of reportlab page state
+
+def iter_failure_flowables(csv_path, report_title, logo_path='', max_failures=None):
+    styles = getSampleStyleSheet()
+    title_style = styles['Heading1']
+    desc_style = styles['BodyText']
+    ref_style = ParagraphStyle('ReferenceStyle', parent=styles['BodyText'], textColor=colors.blue)
+    rationale_style = styles['Italic']
+
+    yield Paragraph(report_title, title_style)
+
+    if logo_path:
+        try:
+            logo = load_logo(logo_path, max_width=LOGO_MAX_WIDTH).flowable()
+        except Exception as e:
+            print(f"Error processing logo: {e}")
+        else:
+            yield logo
+
+    with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
+        for index, row in enumerate(timed(csv.DictReader(csvfile), CSV_READ)):
+            if max_failures and index >= max_failures:
+                # reaching this row means there is at least one failure past the cap
+                note = f"Note: This report contains the first {max_failures} failures identified. Please review the CSV file for additional failures."
+                yield Paragraph(note, desc_style)
+                yield Spacer(1, inch)
+                break
+            # built before yielding so the stage doesn't span reportlab's layout of the previous row
+            with stage(FLOWABLES):
+                reference = row.get('References', 'N/A')
+                flowables = [
+                    Paragraph(f"Failed: {row['Title']}", title_style),
+                    Paragraph(f"Description: {row['Description']}", desc_style),
+                    Paragraph(f"Reference: {reference}", ref_style),
+                    Spacer(1, 12),
+                    Paragraph(f"Rationale: {row['Rationale']}", rationale_style),
+                    Spacer(1, inch)
+                ]
+            yield from flowables
+
+def generate_pdf_from_csv(csv_path, logo_path, report_title, footer_url, output_path, max_failures=None, generated=None,
+                          max_memory_mb=None, segment_pages=None):
+    # max_failures of None or 0 lists every failure; generated is the footer's time (default: now).
+    # With max_memory_mb or segment_pages the PDF is built in segments (see streaming.build_segmented), so
+    # memory stays flat however long the CSV is; segment_pages defaults to SEGMENT_PAGES then.
+    timestamp = (generated or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
+    footer_text = f"{footer_url} - Generated on: {timestamp}"
+
+    def footer(canvas, doc):
+        page_number = canvas.getPageNumber() + getattr(doc, 'page_offset', 0)
+        canvas.saveState()
+        canvas.drawString(inch, 0.75 * inch, footer_text)
+        canvas.drawRightString(10 * inch - 2*inch, 0.75 * inch, f"Page {page_number}")
+        canvas.restoreState()
+
+    story = StreamingStory(iter_failure_flowables(csv_path, report_title, logo_path, max_failures))
+    # exclusive of the CSV reads and flowable construction the streamed story pulls during the build
+    with stage(REPORTLAB_BUILD):
+        if max_memory_mb or segment_pages:
+            build_segmented(output_path, story, segment_pages or SEGMENT_PAGES, max_memory_mb,
+                            build_options={'onFirstPage': footer, 'onLaterPages': footer}, pagesize=letter)
+        else:
+            doc = SimpleDocTemplate(output_path, pagesize=letter)
+            doc.build(story, onFirstPage=footer, onLaterPages=footer)
+
+    return True
+
+def generate_workstation_pdf(csv_path, logo_path, footer_url, max_failures=BULK_MAX_FAILURES, generated=None):
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    report_title = f"Workstation: {name}"  # Extract filename without extension
+    output_path = os.path.join(os.path.dirname(csv_path), f"{name}.pdf")
+    if not generate_pdf_from_csv(csv_path, logo_path, report_title, footer_url, output_path, max_failures, generated):
+        raise RuntimeError(f"PDF generation failed for {csv_path}")
+    return output_path
+
+def generate_folder_pdfs(folder_path, logo_path='', footer_url='', max_failures=BULK_MAX_FAILURES, force=False, **fleet_options):
+    generated = datetime.now()  # one footer timestamp for the whole run
+    jobs = [
+        (csv_file, (os.path.join(folder_path, csv_file), logo_path, footer_url, max_failures, generated))
+        for csv_file in list_csv_files(folder_path)
+    ]
+    settings = {
+        'report': 'narrative',
+        'footer_url': footer_url,
+        'max_failures': max_failures,
+        'logo': file_digest(logo_path) if logo_path else ''
+    }
+    return run_incremental(folder_path, jobs, generate_workstation_pdf, settings, force, **fleet_options)
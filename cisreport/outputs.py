@@ -0,0 +1,125 @@
+import os
+import csv
+import json
+from html import escape
+
+# Output backends for a host's processed rows. The PDF (compliance.generate_pdf) is one of them; the others
+# stream the same HostRecords rows to a file as they are traversed, with no layout step, so a run can hand
+# machine-readable results to a ticketing import or dashboard at close to I/O speed and render the PDF
+# later or not at all. Their files go in an exports/ folder next to the CSVs, so an exported HOST.csv is
+# never read back as a host. (Column names come from compliance, which imports this module.)
+PDF = 'pdf'
+DEFAULT_FORMATS = (PDF,)
+EXPORT_DIR_NAME = 'exports'
+RECORD_KEYS = ['computer_name', 'rule_information', 'standard', 'rule', 'status', 'remediation']
+
+class RowOutput:
+    # Subclasses set suffix and implement write(row, remediation); start() and finish() write what goes
+    # before and after the rows. row is a HostRecords.table_rows() tuple.
+    suffix = None
+
+    def __init__(self, file_path, computer_name, document_title='', generated=None):
+        self.file_path = file_path
+        self.computer_name = computer_name
+        self.document_title = document_title
+        self.generated = generated
+        self.file = open(file_path, 'w', newline='', encoding='utf-8')
+        self.start()
+
+    def start(self):
+        pass
+
+    def finish(self):
+        pass
+
+    def close(self):
+        self.finish()
+        self.file.close()
+
+class CsvOutput(RowOutput):
+    # The columns of compliance.process_csv, one line per compliance item
+    suffix = '.csv'
+
+    def start(self):
+        from .compliance import PROCESSED_COLUMNS
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(PROCESSED_COLUMNS)
+
+    def write(self, row, remediation):
+        self.writer.writerow(row + (remediation,))
+
+class JsonLinesOutput(RowOutput):
+    # One JSON object per compliance item, keyed like the HostRecords columns
+    suffix = '.jsonl'
+
+    def write(self, row, remediation):
+        self.file.write(json.dumps(dict(zip(RECORD_KEYS, row + (remediation,))), ensure_ascii=False) + '\n')
+
+class HtmlOutput(RowOutput):
+    # The PDF's table as a standalone page: title, generation time, and the status colours of the PDF
+    suffix = '.html'
+
+    def start(self):
+        from .compliance import TABLE_COLUMNS
+        title = escape(self.document_title or self.computer_name)
+        generated = self.generated.strftime('%m-%d-%Y at %H:%M') if self.generated else ''
+        self.file.write(
+            '<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+            f'<title>{title}</title>\n<style>\n'
+            'body{font-family:Helvetica,Arial,sans-serif}\n'
+            'table{border-collapse:collapse}\n'
+            'th,td{border:1px solid #000;padding:4px;text-align:center;vertical-align:top}\n'
+            'th{background:grey;color:whitesmoke}\ntd{background:beige}\n'
+            'td.PASSED{color:green}\ntd.FAILED{color:red}\n'
+            f'</style></head><body>\n<h1>{title}</h1>\n'
+            f'<p>Report generated on {generated}</p>\n<table>\n<tr>'
+            + ''.join(f'<th>{escape(column)}</th>' for column in TABLE_COLUMNS) + '</tr>\n')
+
+    def write(self, row, remediation):
+        status = escape(row[4])
+        cells = ''.join(f'<td>{escape(str(value))}</td>' for value in row[:4])
+        self.file.write(f'<tr>{cells}<td class="{"PASSED" if row[4] == "PASSED" else "FAILED"}">{status}</td></tr>\n')
+
+    def finish(self):
+        self.file.write('</table>\n</body></html>\n')
+
+ROW_OUTPUTS = {
+    'csv': CsvOutput,
+    'jsonl': JsonLinesOutput,
+    'html': HtmlOutput,
+}
+OUTPUT_FORMATS = (PDF,) + tuple(ROW_OUTPUTS)
+
+def check_formats(formats):
+    unknown = [name for name in formats if name not in OUTPUT_FORMATS]
+    if unknown or not formats:
+        raise ValueError(f"unknown output formats {', '.join(unknown) or '(none)'}; choose from {', '.join(OUTPUT_FORMATS)}")
+    return tuple(formats)
+
+def export_path(csv_path, name):
+    folder_path = os.path.join(os.path.dirname(csv_path), EXPORT_DIR_NAME)
+    os.makedirs(folder_path, exist_ok=True)
+    base = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(folder_path, base + ROW_OUTPUTS[name].suffix)
+
+class RowOutputs:
+    # The row outputs of one host, written together: write is HostRecords.traverse's on_row hook
+    def __init__(self, outputs):
+        self.outputs = outputs
+        self.paths = [output.file_path for output in outputs]
+
+    def write(self, row, remediation):
+        for output in self.outputs:
+            output.write(row, remediation)
+
+    def close(self):
+        for output in self.outputs:
+            output.close()
+
+def open_row_outputs(csv_path, formats, computer_name, document_title='', generated=None):
+    # None when formats has no row output (a PDF-only run)
+    names = [name for name in formats if name in ROW_OUTPUTS]
+    if not names:
+        return None
+    return RowOutputs([ROW_OUTPUTS[name](export_path(csv_path, name), computer_name, document_title, generated)
+                       for name in names])
@@ -0,0 +1,44 @@
+import ast
+import sys
+import json
+from functools import lru_cache
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # optional, json is only slower
+    _loads = json.loads
+
+def _fast_parse(compliance):
+    # CIS exports write the column as the Python repr of a list of {'key': ..., 'value': ...} dicts.
+    # Without apostrophes in the values that is JSON once the quotes are swapped; a value containing an
+    # apostrophe is written in double quotes by repr, which is left to literal_eval.
+    if '"' in compliance:
+        text = compliance  # real JSON, or a repr with an apostrophe somewhere
+    elif '\\' in compliance:
+        return None  # escapes mean something different in the two syntaxes
+    else:
+        text = compliance.replace("'", '"')
+    try:
+        items = _loads(text)
+    except ValueError:
+        return None
+    if text is not compliance and compliance.count("'") != 8 * len(items):
+        return None  # a quote inside a value made it through the swap, don't trust the result
+    return items
+
+@lru_cache(maxsize=65536)
+def parse_compliance(compliance):
+    # Returns ((key, value), ...). Compliance blobs repeat heavily across rules and hosts, so each distinct
+    # one is decoded once per process; keys and values are interned as they repeat across blobs too.
+    items = _fast_parse(compliance)
+    try:
+        if items is None:
+            items = ast.literal_eval(compliance)
+        return tuple((sys.intern(str(item['key'])), sys.intern(str(item['value']))) for item in items)
+    except (ValueError, SyntaxError, TypeError, KeyError, MemoryError, RecursionError) as e:
+        raise ValueError(f"Unreadable Compliance value {compliance[:120]!r}") from e
+
+def standard_index(keys, mapping):
+    # Precompiled lookup of the selected raw keys to the names shown in reports
+    return {key: mapping.get(key, key) for key in keys}
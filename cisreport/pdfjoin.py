@@ -0,0 +1,90 @@
+import re
+
+# Joins PDFs written by reportlab into one, for documents built in segments (see streaming.build_segmented).
+# Every object of every segment is copied with its number shifted past the previous segments' objects; a new
+# page tree adopts each segment's page tree as a child and a new catalog points at it. Streams are copied
+# byte for byte and only one segment file is read at a time. Only what reportlab writes is understood: a
+# classic xref table, one page tree per file, and no outlines or named destinations across segments.
+XREF_HEADER = re.compile(rb'xref\s+0 (\d+)\s+')
+XREF_ENTRY = re.compile(rb'(\d{10}) \d{5} ([nf])')
+STREAM_START = re.compile(rb'>>\s*stream\r?\n')
+REFERENCE = re.compile(rb'\b(\d+) 0 R\b')
+
+def _trailer_reference(trailer, key):
+    match = re.search(rb'/' + key + rb' (\d+) 0 R', trailer)
+    if match is None:
+        raise ValueError(f"PDF trailer has no /{key.decode()}")
+    return int(match.group(1))
+
+def read_segment(path):
+    # Returns (objects, root, info): objects maps object number -> its bytes from 'N 0 obj' to 'endobj'
+    with open(path, 'rb') as f:
+        data = f.read()
+    xref_start = int(data[data.rindex(b'startxref') + len(b'startxref'):].split()[0])
+    header = XREF_HEADER.match(data, xref_start)
+    if header is None:
+        raise ValueError(f"{path}: no classic xref table")
+    count = int(header.group(1))
+    offsets = {}
+    position = header.end()
+    for number in range(count):
+        entry = XREF_ENTRY.match(data, position)
+        position += 20
+        if entry.group(2) == b'n':
+            offsets[number] = int(entry.group(1))
+    trailer = data[position:]
+    # reportlab writes objects back to back, so each one ends where the next starts
+    starts = sorted((offset, number) for number, offset in offsets.items())
+    objects = {}
+    for (offset, number), (end, _) in zip(starts, starts[1:] + [(xref_start, None)]):
+        body = data[offset:end]
+        objects[number] = body[:body.rindex(b'endobj') + len(b'endobj')]
+    return objects, _trailer_reference(trailer, b'Root'), _trailer_reference(trailer, b'Info')
+
+def renumber(body, shift):
+    # Shifts the object's own number and every reference outside its stream data
+    match = STREAM_START.search(body)
+    head, stream = (body[:match.end()], body[match.end():]) if match else (body, b'')
+    head = REFERENCE.sub(lambda m: b'%d 0 R' % (int(m.group(1)) + shift), head)
+    number, rest = head.split(b' ', 1)
+    return b'%d ' % (int(number) + shift) + rest + stream
+
+def join_pdfs(paths, output_path):
+    # Objects 1 and 2 are the joined page tree and catalog; the segments' objects follow them
+    root_pages, catalog = 1, 2
+    offsets = {}
+    kids = []
+    page_count = 0
+    info = None
+    shift = catalog
+    with open(output_path, 'wb') as out:
+        out.write(b'%PDF-1.4\n%\x93\x8c\x8b\x9e\n')
+        for path in paths:
+            objects, root, segment_info = read_segment(path)
+            pages = int(re.search(rb'/Pages (\d+) 0 R', objects[root]).group(1))
+            for number, body in sorted(objects.items()):
+                if number == root or (number == segment_info and info is not None):
+                    continue  # the joined file gets one catalog and keeps the first segment's Info
+                body = renumber(body, shift)
+                if number == pages:
+                    page_count += int(re.search(rb'/Count (\d+)', body).group(1))
+                    kids.append(number + shift)
+                    body = body.replace(b'<<', b'<<\n/Parent %d 0 R' % root_pages, 1)
+                offsets[number + shift] = out.tell()
+                out.write(body + b'\n')
+            if info is None:
+                info = segment_info + shift
+            shift += max(objects)
+        offsets[root_pages] = out.tell()
+        out.write(b'%d 0 obj\n<<\n/Count %d /Kids [ %s ] /Type /Pages\n>>\nendobj\n'
+                  % (root_pages, page_count, b' '.join(b'%d 0 R' % kid for kid in kids)))
+        offsets[catalog] = out.tell()
+        out.write(b'%d 0 obj\n<<\n/PageMode /UseNone /Pages %d 0 R /Type /Catalog\n>>\nendobj\n' % (catalog, root_pages))
+        xref_start = out.tell()
+        size = max(offsets) + 1
+        out.write(b'xref\n0 %d\n0000000000 65535 f \n' % size)
+        for number in range(1, size):
+            offset = offsets.get(number)
+            out.write(b'%010d 00000 n \n' % offset if offset is not None else b'0000000000 65535 f \n')
+        out.write(b'trailer\n<<\n/Info %d 0 R\n/Root %d 0 R\n/Size %d\n>>\nstartxref\n%d\n%%%%EOF\n'
+                  % (info, catalog, size, xref_start))
@@ -0,0 +1,106 @@
+import os
+import json
+import hashlib
+
+INDEX_NAME = '.cis_remediation_index.json'
+INDEX_VERSION = 1
+SEPARATOR = '-' * 80
+
+def text_digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def rule_id(rule_information, digest):
+    # A rule whose remediation differs between hosts (e.g. mixed benchmark versions) gets one entry per text
+    return hashlib.sha256(f"{rule_information}\0{digest}".encode('utf-8')).hexdigest()[:16]
+
+def host_view_path(csv_path):
+    return os.path.splitext(csv_path)[0] + '_Remediation.txt'
+
+def fleet_file_path(document_title, folder_path):
+    # A title equal to a CSV's name would make this that host's HOST_Remediation.txt, so the fleet file
+    # gets _Fleet added until it no longer matches one
+    name = document_title
+    while os.path.exists(os.path.join(folder_path, f"{name}.csv")):
+        name += '_Fleet'
+    return os.path.join(folder_path, f"{name}_Remediation.txt")
+
+def format_standards(standards):
+    return ', '.join(f"{standard} {rule}" for standard, rule in standards)
+
+def write_host_view(file_path, failures):
+    # failures is a list of (rule information, remediation, ((standard, rule), ...)), one per failed rule
+    with open(file_path, 'w') as file:
+        for rule_information, remediation, standards in failures:
+            file.write(f"Compliance Standard: {format_standards(standards)}\n"
+                       f"Rule Information: {rule_information}\n"
+                       f"Remediation: {remediation}\n" + SEPARATOR + '\n')
+
+class RemediationBase:
+    # Fleet-wide remediation index kept next to the CSVs: every distinct remediation text is stored once,
+    # each failed rule once, and each host only as the list of rule ids it fails. Hosts are replaced one at
+    # a time as their results arrive, so reruns only touch what was rebuilt.
+    def __init__(self, folder_path):
+        self.path = os.path.join(folder_path, INDEX_NAME)
+        self.texts = {}
+        self.rules = {}
+        self.hosts = {}
+        self.loaded = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('version') == INDEX_VERSION:
+                self.texts, self.rules, self.hosts = saved['texts'], saved['rules'], saved['hosts']
+                self.loaded = True
+        except (OSError, ValueError, KeyError):
+            pass  # missing or unreadable index, every host is rebuilt
+
+    def set_host(self, name, computer_name, failures):
+        ids = []
+        for rule_information, remediation, standards in failures:
+            digest = text_digest(remediation)
+            self.texts.setdefault(digest, remediation)
+            key = rule_id(rule_information, digest)
+            # the standards follow the latest selection; the id only covers the rule and its remediation
+            self.rules[key] = {'rule': rule_information, 'text': digest, 'standards': [list(s) for s in standards]}
+            ids.append(key)
+        self.hosts[name] = {'computer_name': computer_name, 'rules': ids}
+
+    def remove_host(self, name):
+        self.hosts.pop(name, None)
+
+    def prune(self, names):
+        # Drop hosts whose CSV is gone, then rules and texts no host references any more
+        names = set(names)
+        self.hosts = {name: host for name, host in self.hosts.items() if name in names}
+        used = {key for host in self.hosts.values() for key in host['rules']}
+        self.rules = {key: rule for key, rule in self.rules.items() if key in used}
+        used_texts = {rule['text'] for rule in self.rules.values()}
+        self.texts = {digest: text for digest, text in self.texts.items() if digest in used_texts}
+
+    def failing_hosts(self):
+        hosts = {key: [] for key in self.rules}
+        for host in sorted(self.hosts.values(), key=lambda host: host['computer_name']):
+            for key in host['rules']:
+                hosts[key].append(host['computer_name'])
+        return hosts
+
+    def save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'texts': self.texts, 'rules': self.rules, 'hosts': self.hosts}, f)
+        os.replace(tmp_path, self.path)
+
+    def write_fleet_file(self, file_path, document_title=''):
+        # Most widespread failures first, each with its remediation written once
+        hosts = self.failing_hosts()
+        ranked = sorted(self.rules.items(), key=lambda item: (-len(hosts[item[0]]), item[1]['rule']))
+        with open(file_path, 'w') as file:
+            file.write(f"Fleet Remediation: {document_title}\n"
+                       f"{len(self.hosts)} hosts, {len(self.rules)} failed rules, {len(self.texts)} distinct remediations\n"
+                       + '=' * 80 + '\n')
+            for key, rule in ranked:
+                failing = hosts[key]
+                file.write(f"Compliance Standard: {format_standards(rule['standards'])}\n"
+                           f"Rule Information: {rule['rule']}\n"
+                           f"Failing Hosts ({len(failing)}): {', '.join(failing)}\n"
+                           f"Remediation: {self.texts[rule['text']]}\n" + SEPARATOR + '\n')
@@ -0,0 +1,126 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from .assets import CACHE_DIR_ENV, evict_disk_cache, write_atomic
+from .fleet import list_csv_files
+
+# Processed CSVs cached by content hash, so re-rendering with another title, logo or selection of standards
+# skips CSV parsing and Compliance decoding. Each file holds every compliance item of the scan (all standards)
+# as dictionary-encoded columns:
+#   MAGIC | header length (uint64 LE) | JSON header | padding to 8 | one code array per column
+# The header lists each column's distinct values, code dtype and offset; the code arrays are read with
+# np.memmap, so filtering touches only the small integer codes and decodes just the selected rows.
+# Workers only add entries; the run that owns the cache trims it once at the end (trim_scan_cache), so
+# entries are not evicted while the fleet that needs them is still being rendered.
+MAGIC = b'CISCOL03'  # bump when the file layout or the way rows are processed changes
+SCAN_SUFFIX = '.cols'
+SCAN_CACHE_NAME = '.cis_scan_cache'  # per-folder default, next to the manifest
+DEFAULT_SCAN_CACHE_MAX_BYTES = 256 * 1024 * 1024  # the least trim_scan_cache keeps, see scan_cache_max_bytes
+
+def scan_cache_dir(folder_path):
+    shared = os.environ.get(CACHE_DIR_ENV)
+    return os.path.join(shared, 'scans') if shared else os.path.join(folder_path, SCAN_CACHE_NAME)
+
+def scan_cache_max_bytes(folder_path, max_bytes=None):
+    # max_bytes, or enough for the whole folder: an entry is about a third of its CSV, so the CSVs' total
+    # size leaves room for the fleet and some earlier scans (never less than the default)
+    if max_bytes:
+        return max_bytes
+    total = 0
+    for name in list_csv_files(folder_path):
+        try:
+            total += os.path.getsize(os.path.join(folder_path, name))
+        except OSError:
+            pass  # removed since it was listed
+    return max(DEFAULT_SCAN_CACHE_MAX_BYTES, total)
+
+def trim_scan_cache(cache_dir, folder_path, max_bytes=None):
+    # Least recently used entries go first, see assets.evict_disk_cache
+    if os.path.isdir(cache_dir):
+        evict_disk_cache(cache_dir, scan_cache_max_bytes(folder_path, max_bytes), SCAN_SUFFIX)
+
+def scan_cache_file(cache_dir, digest):
+    return os.path.join(cache_dir, digest + SCAN_SUFFIX)
+
+def _code_dtype(size):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if size <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+def _align(size):
+    return (size + 7) & ~7
+
+def write_scan(cache_file, columns):
+    # columns maps column name -> list of strings, all the same length
+    rows = len(next(iter(columns.values()), []))
+    header = {'rows': rows, 'columns': {}}
+    arrays = []
+    offset = 0
+    for name, values in columns.items():
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+        dtype = _code_dtype(len(uniques))
+        header['columns'][name] = {'dictionary': list(uniques), 'dtype': dtype.str, 'offset': offset}
+        arrays.append(codes.astype(dtype))
+        offset += _align(arrays[-1].nbytes)
+    encoded = json.dumps(header).encode('utf-8')
+    preamble = MAGIC + len(encoded).to_bytes(8, 'little') + encoded
+    preamble += b'\0' * (_align(len(preamble)) - len(preamble))
+
+    def chunks():
+        yield preamble
+        for array in arrays:
+            yield array.tobytes()
+            yield b'\0' * (_align(array.nbytes) - array.nbytes)
+
+    write_atomic(cache_file, chunks())
+
+class ScanFile:
+    # data is the file's code arrays, mapped once when the entry is opened, so the columns stay readable
+    # even if the entry is evicted (unlinked) while a worker is still using it
+    def __init__(self, cache_file, header, data):
+        self.path = cache_file
+        self.rows = header['rows']
+        self._columns = header['columns']
+        self._data = data
+
+    def dictionary(self, name):
+        return self._columns[name]['dictionary']
+
+    def codes(self, name):
+        column = self._columns[name]
+        dtype = np.dtype(column['dtype'])
+        start = column['offset']
+        return self._data[start:start + self.rows * dtype.itemsize].view(dtype)
+
+    def take(self, name, index):
+        # Decodes the rows at index (all rows if None) back to a list of strings
+        codes = self.codes(name)
+        if index is not None:
+            codes = codes[index]
+        return np.asarray(self.dictionary(name), dtype=object)[codes].tolist()
+
+def open_scan(cache_file):
+    # Returns None when there is no usable entry, so the caller reparses the CSV and rewrites it
+    try:
+        with open(cache_file, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            length = int.from_bytes(f.read(8), 'little')
+            header = json.loads(f.read(length).decode('utf-8'))
+            size = os.fstat(f.fileno()).st_size
+            data_offset = _align(len(MAGIC) + 8 + length)
+            expected = sum(_align(header['rows'] * np.dtype(column['dtype']).itemsize)
+                           for column in header['columns'].values())
+            if size < data_offset + expected:
+                return None  # truncated
+            # mapped from the open file, so an eviction between opening and mapping cannot break it
+            data = np.memmap(f, np.uint8, 'r', offset=data_offset, shape=(expected,)) if expected else np.empty(0, np.uint8)
+    except (OSError, ValueError):
+        return None
+    try:
+        os.utime(cache_file)  # bump for LRU eviction
+    except OSError:
+        pass  # evicted after it was mapped, still readable
+    return ScanFile(cache_file, header, data)
@@ -0,0 +1,149 @@
+import os
+import queue
+import signal
+import threading
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from .fleet import RunControl
+
+# kind is 'started', 'progress' (result and text set) or 'finished' (see Batch.state)
+SchedulerEvent = namedtuple('SchedulerEvent', ['kind', 'batch', 'result', 'text'])
+
+def _ignore_interrupt():
+    # Ctrl+C reaches the whole process group; only the parent should act on it (by shutting the scheduler
+    # down), not every worker with a KeyboardInterrupt traceback of its own
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+class Batch:
+    def __init__(self, batch_id, label, function, args, kwargs):
+        self.id = batch_id
+        self.label = label
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.control = RunControl()
+        self.state = 'queued'  # then 'running', and 'done', 'failed' or 'cancelled' (jobs were dropped)
+        self.summary = None
+        self.error = None
+
+class JobScheduler:
+    # Runs queued batches back to back on a background thread, all sharing one worker pool that stays
+    # warm between batches (logo and compliance caches included). A batch is a call to a run_fleet-based
+    # function such as generate_folder_pdfs or process_folder; it receives on_progress, control, executor
+    # and max_workers. GUIs call poll() from their event loop (Tk after, QTimer) to receive the events,
+    # so no callback ever runs on the GUI thread from elsewhere.
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+        self._batches = queue.Queue()
+        self._events = queue.Queue()
+        self._unfinished = []
+        self._paused = False
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._thread = threading.Thread(target=self._dispatch, daemon=True)
+        self._thread.start()
+
+    def submit(self, label, function, *args, **kwargs):
+        with self._lock:
+            batch = Batch(self._next_id, label, function, args, kwargs)
+            self._next_id += 1
+            if self._paused:
+                batch.control.pause()
+            self._unfinished.append(batch)
+        self._batches.put(batch)
+        return batch
+
+    def poll(self):
+        # Events since the last poll, oldest first; call from the GUI thread
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def pending(self):
+        with self._lock:
+            return list(self._unfinished)
+
+    def pause(self):
+        # Running jobs finish, no new ones start (batches queued while paused wait too)
+        with self._lock:
+            self._paused = True
+            for batch in self._unfinished:
+                batch.control.pause()
+
+    def resume(self):
+        with self._lock:
+            self._paused = False
+            for batch in self._unfinished:
+                batch.control.resume()
+
+    @property
+    def paused(self):
+        return self._paused
+
+    def cancel(self, batch=None):
+        # Cancel one batch, or the running one and everything queued
+        for unfinished in ([batch] if batch else self.pending()):
+            unfinished.control.cancel()
+
+    def warm(self, function, *args):
+        # Start the workers now and run function(*args) on them (imports, logo cache), so the first batch
+        # does not pay for process start-up. Spawned pools start a process per task while none is idle.
+        if self.max_workers == 1:
+            function(*args)
+            return
+        executor = self._pool()
+        for future in [executor.submit(function, *args) for _ in range(self.max_workers)]:
+            future.result()
+
+    def shutdown(self):
+        self.cancel()
+        self._batches.put(None)
+        self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+
+    def _pool(self):
+        if self._executor is not None and getattr(self._executor, '_broken', False):
+            self._executor.shutdown(wait=False)  # a worker process died, start a fresh pool
+            self._executor = None
+        if self._executor is None:
+            # spawn, so workers never fork a process that is running a GUI and this thread
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context('spawn'),
+                                                 initializer=_ignore_interrupt)
+        return self._executor
+
+    def _dispatch(self):
+        while True:
+            batch = self._batches.get()
+            if batch is None:
+                return
+            if not batch.control.cancelled:
+                self._run(batch)
+            else:
+                batch.state = 'cancelled'
+            with self._lock:
+                self._unfinished.remove(batch)
+            self._events.put(SchedulerEvent('finished', batch, None, None))
+
+    def _run(self, batch):
+        batch.state = 'running'
+        self._events.put(SchedulerEvent('started', batch, None, None))
+
+        def on_progress(progress):
+            self._events.put(SchedulerEvent('progress', batch, progress.last, progress.format()))
+
+        try:
+            executor = self._pool() if self.max_workers > 1 else None
+            batch.summary = batch.function(*batch.args, on_progress=on_progress, control=batch.control,
+                                           executor=executor, max_workers=self.max_workers, **batch.kwargs)
+        except Exception as e:
+            batch.error = e
+            batch.state = 'failed'
+            return
+        # a cancel that came after the last job started dropped nothing, so the batch did finish
+        batch.state = 'cancelled' if batch.summary is not None and batch.summary.cancelled else 'done'
@@ -0,0 +1,97 @@
+import os
+import gc
+from reportlab.platypus import SimpleDocTemplate
+from .instrument import current_rss_mb
+from .pdfjoin import join_pdfs
+
+class StreamingStory(list):
+    # A story list for doc.build() that pulls flowables from an iterator as reportlab consumes them,
+    # so only a small window of flowables is alive at any time instead of the whole document.
+    # reportlab only ever looks at the head of the story (len, [0], del [0], and inserting split parts).
+    def __init__(self, flowables, lookahead=64):
+        super().__init__()
+        self._source = iter(flowables)
+        self._lookahead = lookahead
+        self._paused = False
+        self._fill()
+
+    def _fill(self):
+        while self._source is not None and list.__len__(self) < self._lookahead:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def pause(self):
+        # Look empty to doc.build(), which then finishes its document after the current page;
+        # resume() hands the remaining flowables to the next one
+        self._paused = True
+
+    def resume(self):
+        self._paused = False
+
+    def __len__(self):
+        if self._paused:
+            return 0
+        self._fill()
+        return list.__len__(self)
+
+    def __bool__(self):
+        return len(self) > 0
+
+MIN_SEGMENT_PAGES = 25  # the memory ceiling never ends a segment sooner (each one embeds its fonts again)
+
+class SegmentDocTemplate(SimpleDocTemplate):
+    # One part of a document built in segments: pauses the story at the end of the page on which the
+    # segment is full. page_offset is the number of pages in the segments before it.
+    def __init__(self, filename, story, segment_pages, max_memory_mb=None, page_offset=0, **kwargs):
+        SimpleDocTemplate.__init__(self, filename, **kwargs)
+        self.story = story
+        self.segment_pages = segment_pages
+        self.max_memory_mb = max_memory_mb
+        self.page_offset = page_offset
+        self.pages = 0
+
+    def afterPage(self):
+        self.pages += 1
+        rss = current_rss_mb() if self.max_memory_mb else None
+        if self.pages >= self.segment_pages or (rss is not None and rss >= self.max_memory_mb
+                                                and self.pages >= MIN_SEGMENT_PAGES):
+            self.story.pause()
+
+def build_segmented(output_path, story, segment_pages, max_memory_mb=None, build_options=None, **doc_options):
+    # Builds a StreamingStory into output_path in segments of at most segment_pages pages, ending a segment
+    # early once the process RSS reaches max_memory_mb. reportlab holds every page of a document until it is
+    # saved, so this bounds memory by the segment instead of the document; each segment is written to disk
+    # as it completes and the parts are joined at the end. Every segment starts at a page boundary with the
+    # story where the previous one stopped, so the pages are the same as a single build's. Page callbacks
+    # in build_options get the segment's SegmentDocTemplate and should add its page_offset to page numbers.
+    part_paths = []
+    page_offset = 0
+    rss = current_rss_mb() if max_memory_mb else None
+    if rss is not None and rss >= max_memory_mb:
+        print(f"Memory use ({rss:.0f} MB) is already above the {max_memory_mb:.0f} MB ceiling, "
+              f"building segments of {MIN_SEGMENT_PAGES} pages")
+    try:
+        while True:
+            story.resume()
+            if not story:
+                break
+            part_path = f"{output_path}.{os.getpid()}.{len(part_paths)}.part"
+            part_paths.append(part_path)
+            doc = SegmentDocTemplate(part_path, story, segment_pages, max_memory_mb, page_offset, **doc_options)
+            doc.build(story, **(build_options or {}))
+            page_offset += doc.pages
+            # the finished document, its canvas and pages hold each other in reference cycles; free them
+            # now so the next segment reuses their memory instead of growing the heap
+            del doc
+            gc.collect()
+        if len(part_paths) == 1:
+            os.replace(part_paths[0], output_path)
+        elif part_paths:
+            join_pdfs(part_paths, output_path)
+    finally:
+        for part_path in part_paths:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+    return page_offset
@@ -0,0 +1,143 @@
+import os
+import csv
+import json
+from xml.sax.saxutils import escape
+from collections import Counter
+from datetime import datetime
+from .compliance import COMPLIANCE_MAPPING, host_name, read_host
+from .scancache import scan_cache_dir, trim_scan_cache
+from .fleet import list_csv_files, run_fleet
+
+SUMMARY_KEY_COLUMNS = ['Compliance Standard', 'Compliance Rule', 'Rule Information', 'Status']
+SUMMARY_BASENAME = 'fleet_summary'  # also the default output subfolder, so the CSV is not re-read as a host
+
+def count_host(file_path, selected_standards, cache_dir=None):
+    # Runs in a worker: reduce one host to its distinct (standard, rule, info, status) keys
+    computer_name = host_name(file_path)
+    records = read_host(file_path, selected_standards, cache_dir=cache_dir)
+    keys = set(zip(records.standard, records.rule, records.rule_information, records.status))
+    statuses = Counter(key[3] for key in keys)
+    return computer_name, list(keys), dict(statuses)
+
+class FleetCounters:
+    # Only one counter per distinct control/status and one per host are kept, never the rows
+    def __init__(self):
+        self.controls = Counter()
+        self.hosts = {}
+
+    def add(self, computer_name, keys, statuses):
+        self.controls.update(keys)
+        self.hosts[computer_name] = statuses
+
+    def ranked(self, status=None):
+        items = ((key, count) for key, count in self.controls.items() if status is None or key[3] == status)
+        return sorted(items, key=lambda item: (-item[1], item[0]))
+
+    def percent(self, count):
+        return 100.0 * count / len(self.hosts) if self.hosts else 0.0
+
+def summarize_folder(folder_path, selected_standards, on_result=None, scan_cache=True, scan_cache_max_bytes=None,
+                     **fleet_options):
+    counters = FleetCounters()
+    cache_dir = scan_cache_dir(folder_path) if scan_cache else None
+
+    def collect(result, completed):
+        if result.ok:
+            counters.add(*result.value)
+        if on_result:
+            on_result(result, completed)
+
+    jobs = [
+        (file_name, (os.path.join(folder_path, file_name), selected_standards, cache_dir))
+        for file_name in list_csv_files(folder_path)
+    ]
+    try:
+        summary = run_fleet(jobs, count_host, on_result=collect, **fleet_options)
+    finally:
+        if cache_dir:
+            trim_scan_cache(cache_dir, folder_path, scan_cache_max_bytes)
+    return counters, summary
+
+def write_summary_csv(counters, file_path):
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_KEY_COLUMNS + ['Hosts', 'Percent of Hosts'])
+        for key, count in counters.ranked():
+            writer.writerow(list(key) + [count, f"{counters.percent(count):.1f}"])
+
+def write_summary_index(counters, summary, selected_standards, file_path):
+    index = {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'standards': [COMPLIANCE_MAPPING.get(key, key) for key in selected_standards],
+        'host_count': len(counters.hosts),
+        'failed_files': [result.name for result in summary.failed],
+        'hosts': counters.hosts,
+        'controls': [
+            dict(zip(['standard', 'rule', 'rule_information', 'status'], key), hosts=count)
+            for key, count in counters.ranked()
+        ]
+    }
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=1)
+
+def write_summary_pdf(counters, file_path, document_title='', logo_path=''):
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter, landscape
+    from reportlab.lib.units import inch
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from .assets import load_logo, LOGO_MAX_HEIGHT
+
+    pdf = SimpleDocTemplate(file_path, pagesize=landscape(letter))
+    styles = getSampleStyleSheet()
+    styleN = styles['Normal']
+    elements = []
+    if logo_path:
+        elements.append(load_logo(logo_path, max_height=LOGO_MAX_HEIGHT).flowable())
+    elements.append(Paragraph(document_title or 'Fleet Compliance Summary', styles['Title']))
+    failed_hosts = sum(1 for statuses in counters.hosts.values() if statuses.get('FAILED'))
+    elements.append(Paragraph(
+        f"{len(counters.hosts)} hosts evaluated, {failed_hosts} with at least one failed control. "
+        f"Generated on {datetime.now().strftime('%m-%d-%Y at %H:%M')}.", styleN))
+    elements.append(Spacer(1, 0.25 * inch))
+
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ])
+
+    elements.append(Paragraph('Failed Controls by Number of Hosts', styles['Heading2']))
+    rows = [['Compliance Standard', 'Compliance Rule', 'Rule Information', 'Failing Hosts', '% of Hosts']]
+    rows.extend(
+        [standard, rule, Paragraph(escape(str(info)), styleN), count, f"{counters.percent(count):.1f}%"]
+        for (standard, rule, info, _), count in counters.ranked('FAILED')
+    )
+    controls = Table(rows, colWidths=[1.5*inch, 1.5*inch, 4*inch, 1.1*inch, 0.9*inch], repeatRows=1)
+    controls.setStyle(table_style)
+    elements.append(controls)
+    elements.append(Spacer(1, 0.25 * inch))
+
+    elements.append(Paragraph('Hosts', styles['Heading2']))
+    rows = [['Computer Name', 'Passed', 'Failed']]
+    rows.extend(
+        [name, statuses.get('PASSED', 0), statuses.get('FAILED', 0)]
+        for name, statuses in sorted(counters.hosts.items(), key=lambda item: (-item[1].get('FAILED', 0), item[0]))
+    )
+    hosts = Table(rows, colWidths=[3*inch, 1.5*inch, 1.5*inch], repeatRows=1)
+    hosts.setStyle(table_style)
+    elements.append(hosts)
+    pdf.build(elements)
+
+def write_fleet_summary(folder_path, selected_standards, document_title='', logo_path='', output_dir=None, **fleet_options):
+    counters, summary = summarize_folder(folder_path, selected_standards, **fleet_options)
+    output_dir = output_dir or os.path.join(folder_path, SUMMARY_BASENAME)
+    os.makedirs(output_dir, exist_ok=True)
+    output_base = os.path.join(output_dir, SUMMARY_BASENAME)
+    write_summary_csv(counters, output_base + '.csv')
+    write_summary_index(counters, summary, selected_standards, output_base + '.json')
+    write_summary_pdf(counters, output_base + '.pdf', document_title, logo_path)
+    return summary
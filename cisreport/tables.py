@@ -0,0 +1,118 @@
+from xml.sax.saxutils import escape
+from reportlab.lib import colors
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Table, TableStyle, Paragraph, PageBreak
+
+# Defaults of reportlab's table cells, used to predict row heights without laying the table out
+CELL_PADDING_X = 6
+CELL_PADDING_Y = 3
+HEADER_BOTTOM_PADDING = 12
+
+class PagedTableRenderer:
+    # Splits a large table into page-sized Tables that each repeat the header, so reportlab never has
+    # to split (and re-measure) one huge table. Single-line cells stay plain strings; wrapped cells
+    # become Paragraphs that are cached per column, as rule titles repeat once per compliance item.
+    def __init__(self, header, col_widths, style, font_name='Helvetica', font_size=10, base_commands=(),
+                 status_column=None, status_colors=None, default_status_color=None):
+        self.col_widths = col_widths
+        self.style = style
+        self.font_name = font_name
+        self.font_size = font_size
+        self.leading = 1.2 * font_size
+        self.base_commands = list(base_commands)
+        self.status_column = status_column
+        self.status_colors = status_colors or {}
+        self.default_status_color = default_status_color
+        self._paragraphs = [{} for _ in col_widths]
+
+        header_style = ParagraphStyle('TableHeader', parent=style, fontName='Helvetica-Bold', textColor=colors.whitesmoke)
+        self.header = []
+        header_height = 0
+        for col, text in enumerate(header):
+            if self._fits(col, text, 'Helvetica-Bold'):
+                self.header.append(text)
+                height = self.leading
+            else:
+                paragraph = Paragraph(escape(text), header_style)
+                height = paragraph.wrap(self._inner_width(col), 1e6)[1]
+                self.header.append(paragraph)
+            header_height = max(header_height, height)
+        self.header_height = header_height + CELL_PADDING_Y + HEADER_BOTTOM_PADDING
+
+    def _inner_width(self, col):
+        return self.col_widths[col] - 2 * CELL_PADDING_X
+
+    def _fits(self, col, text, font_name=None):
+        return '\n' not in text and stringWidth(text, font_name or self.font_name, self.font_size) <= self._inner_width(col)
+
+    def cell(self, col, value):
+        text = '' if value is None else str(value)
+        cached = self._paragraphs[col].get(text)
+        if cached is not None:
+            return cached
+        if self._fits(col, text):
+            cached = (text, self.leading)
+        else:
+            paragraph = Paragraph(escape(text), self.style)
+            cached = (paragraph, paragraph.wrap(self._inner_width(col), 1e6)[1])
+        self._paragraphs[col][text] = cached
+        return cached
+
+    def _status_commands(self, statuses):
+        # One BACKGROUND command per run of equal statuses instead of one per row
+        commands = []
+        start = 0
+        for row_idx in range(1, len(statuses) + 1):
+            if row_idx == len(statuses) or statuses[row_idx] != statuses[start]:
+                color = self.status_colors.get(statuses[start], self.default_status_color)
+                if color is not None:
+                    col = self.status_column
+                    commands.append(('BACKGROUND', (col, start + 1), (col, row_idx), color))
+                start = row_idx
+        return commands
+
+    def _table(self, rows, statuses):
+        table = Table([self.header] + rows, colWidths=self.col_widths, repeatRows=1)
+        commands = self.base_commands
+        if self.status_column is not None:
+            commands = commands + self._status_commands(statuses)
+        table.setStyle(TableStyle(commands))
+        return table
+
+    def pages(self, rows, avail_height, first_avail_height=None):
+        # Splits rows into page-sized (cells, statuses) chunks; always at least one, possibly empty
+        page_height = first_avail_height or avail_height
+        chunk, statuses = [], []
+        used = self.header_height
+        emitted = False
+        for values in rows:
+            cells, height = [], 0
+            for col, value in enumerate(values):
+                cell, cell_height = self.cell(col, value)
+                cells.append(cell)
+                height = max(height, cell_height)
+            height += 2 * CELL_PADDING_Y
+            if chunk and used + height > page_height:
+                yield chunk, statuses
+                emitted = True
+                chunk, statuses = [], []
+                used = self.header_height
+                page_height = avail_height
+            chunk.append(cells)
+            if self.status_column is not None:
+                statuses.append(values[self.status_column])
+            used += height
+        if chunk or not emitted:
+            yield chunk, statuses
+
+    def page_count(self, rows, avail_height, first_avail_height=None):
+        # How many pages tables() lays the same rows out on, without building the Tables
+        return sum(1 for _ in self.pages(rows, avail_height, first_avail_height))
+
+    def tables(self, rows, avail_height, first_avail_height=None):
+        # rows yields sequences of cell values; avail_height is the usable frame height per page
+        for index, (chunk, statuses) in enumerate(self.pages(rows, avail_height, first_avail_height)):
+            if index:
+                yield PageBreak()  # the page is full, don't let reportlab try to split the next table into it
+            yield self._table(chunk, statuses)
@@ -0,0 +1,159 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from reportlab.lib.styles import getSampleStyleSheet
+from .assets import load_logo, LOGO_MAX_HEIGHT
+from .compliance import make_table_renderer, process_folder
+from .fleet import list_csv_files
+from .scheduler import JobScheduler
+
+# Watch-folder daemon: scanners drop workstation CSVs into a folder during the day and every new or changed
+# one gets its compliance PDF and remediation files, as process_folder would write them, a few seconds later.
+# Changes come from inotify on Linux and from polling the folder elsewhere (or with poll=True, as network
+# shares do not deliver inotify events for writes made on other machines).
+DEFAULT_SETTLE_SECONDS = 2.0  # a CSV is processed once its size and mtime stop changing for this long
+DEFAULT_POLL_SECONDS = 1.0
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+IN_EVENT = struct.Struct('iIII')  # wd, mask, cookie, name length; the name follows, NUL padded
+
+class InotifyWatcher:
+    def __init__(self, folder_path):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self._fd, os.fsencode(folder_path), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(error, f'inotify_add_watch failed for {folder_path}')
+
+    def changes(self, timeout):
+        # Names of the CSVs written, created or moved in within timeout seconds
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return set()
+        try:
+            data = os.read(self._fd, 65536)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return set()
+            raise
+        names = set()
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = IN_EVENT.unpack_from(data, offset)
+            offset += IN_EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if name.endswith('.csv'):
+                names.add(name)
+        return names
+
+    def close(self):
+        os.close(self._fd)
+
+class PollingWatcher:
+    def __init__(self, folder_path, interval=DEFAULT_POLL_SECONDS):
+        self.folder_path = folder_path
+        self.interval = interval
+        self._seen = {}
+
+    def changes(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        names = set()
+        current = {}
+        for name in list_csv_files(self.folder_path):
+            signature = file_signature(os.path.join(self.folder_path, name))
+            if signature is None:
+                continue
+            current[name] = signature
+            if self._seen.get(name) != signature:
+                names.add(name)
+        self._seen = current
+        return names
+
+    def close(self):
+        pass
+
+def open_watcher(folder_path, poll=False, interval=DEFAULT_POLL_SECONDS):
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(folder_path)
+        except (OSError, AttributeError) as e:  # no inotify in libc, or out of watches
+            print(f"inotify unavailable ({e}), polling {folder_path} every {interval}s")
+    return PollingWatcher(folder_path, interval)
+
+def file_signature(file_path):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None  # deleted or renamed away
+    return stat.st_size, stat.st_mtime_ns
+
+class Debouncer:
+    # Holds changed CSVs back until they have not changed for settle seconds, so a file still being
+    # copied in is not rendered half written
+    def __init__(self, folder_path, settle=DEFAULT_SETTLE_SECONDS):
+        self.folder_path = folder_path
+        self.settle = settle
+        self.pending = {}  # name -> (signature, time it was last seen changing)
+
+    def touch(self, names, now):
+        for name in names:
+            self.pending[name] = (file_signature(os.path.join(self.folder_path, name)), now)
+
+    def ready(self, now):
+        ready = []
+        for name, (signature, since) in list(self.pending.items()):
+            current = file_signature(os.path.join(self.folder_path, name))
+            if current is None:
+                del self.pending[name]
+            elif current != signature:
+                self.pending[name] = (current, now)
+            elif now - since >= self.settle:
+                del self.pending[name]
+                ready.append(name)
+        return sorted(ready)
+
+def warm_worker(logo_path=''):
+    # Runs on each pool process before the first file: importing this module loads the report modules,
+    # and the logo is resized into the process cache
+    make_table_renderer(getSampleStyleSheet()['Normal'])
+    if logo_path:
+        load_logo(logo_path, max_height=LOGO_MAX_HEIGHT)
+
+def watch_folder(folder_path, selected_standards, document_title='', logo_path='', settle=DEFAULT_SETTLE_SECONDS,
+                 poll=False, interval=DEFAULT_POLL_SECONDS, max_workers=None, on_event=None, stop=None, **options):
+    # Runs until stop (a threading.Event) is set or the process is interrupted. Every CSV already in the
+    # folder goes through the debouncer once at start-up, so files changed while the daemon was down are
+    # caught up (unchanged ones are skipped by the manifest). Settled files are queued as process_folder
+    # batches on one warm JobScheduler pool; on_event receives its SchedulerEvents.
+    scheduler = JobScheduler(max_workers)
+    watcher = open_watcher(folder_path, poll, interval)
+    debouncer = Debouncer(folder_path, settle)
+    try:
+        scheduler.warm(warm_worker, logo_path)
+        debouncer.touch(list_csv_files(folder_path), time.monotonic())
+        while stop is None or not stop.is_set():
+            debouncer.touch(watcher.changes(min(interval, settle / 2)), time.monotonic())
+            ready = debouncer.ready(time.monotonic())
+            if ready:
+                scheduler.submit(', '.join(ready), process_folder, folder_path, selected_standards, document_title,
+                                 logo_path, only=ready, **options)
+            for event in scheduler.poll():
+                if on_event:
+                    on_event(event)
+    finally:
+        watcher.close()
+        scheduler.shutdown()
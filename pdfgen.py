@@ -1,20 +1,20 @@
+import os
 import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch, cm
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-import csv
-from PIL import Image as PILImage, ImageOps, ImageChops
-from datetime import datetime
+from tkinter import messagebox
+from cisreport.fleet import run_fleet
+from cisreport.narrative import generate_pdf_from_csv
+from cisreport.scheduler import JobScheduler
+
+POLL_MS = 100  # how often the window picks up progress from the scheduler
 
 class PDFGeneratorApp:
     
     def __init__(self, root):
         self.root = root
         self.root.title("CIS Benchmark | Made with ❤️ by Steven Olsen")
+        self.scheduler = JobScheduler(max_workers=1)  # one report at a time, rendered off the GUI thread
         
         # CSV Selection
         self.csv_frame = ttk.LabelFrame(root, text="CSV Selection")
@@ -50,9 +50,13 @@ class PDFGeneratorApp:
         self.gen_frame = ttk.LabelFrame(root, text="Generate PDF")
         self.gen_frame.grid(row=3, column=0, padx=10, pady=5, sticky="ew")
         self.status_label = ttk.Label(self.gen_frame, text="Status: Awaiting Input")
-        self.status_label.grid(row=0, column=0, columnspan=2, padx=5, pady=5, sticky="ew")
+        self.status_label.grid(row=0, column=0, columnspan=3, padx=5, pady=5, sticky="ew")
         ttk.Button(self.gen_frame, text="Generate PDF", command=self.generate_pdf).grid(row=1, column=0, padx=5, pady=5)
-        ttk.Button(self.gen_frame, text="Exit", command=root.quit).grid(row=1, column=1, padx=5, pady=5)
+        # a report being rendered cannot be stopped, so Cancel only drops the ones still waiting their turn
+        self.cancel_button = ttk.Button(self.gen_frame, text="Cancel", command=self.scheduler.cancel, state="disabled")
+        self.cancel_button.grid(row=1, column=1, padx=5, pady=5)
+        ttk.Button(self.gen_frame, text="Exit", command=self.exit).grid(row=1, column=2, padx=5, pady=5)
+        self.root.after(POLL_MS, self.poll_scheduler)
         
     def browse_csv(self):
         file_path = filedialog.askopenfilename(title="Select CSV", filetypes=[("CSV Files", "*.csv")])
@@ -67,61 +71,39 @@ class PDFGeneratorApp:
         self.output_path.set(file_path)
 
     def generate_pdf(self):
-        success = generate_pdf_from_csv(self.csv_path.get(), self.logo_path.get(), self.report_title.get(), self.report_url.get(), self.output_path.get())
-        if success:
-            self.status_label.config(text="Status: PDF Generation Successful!")
-        else:
-            self.status_label.config(text="Status: PDF Generation Failed!")
+        csv_path = self.csv_path.get()
+        args = (csv_path, self.logo_path.get(), self.report_title.get(), self.report_url.get(), self.output_path.get())
+        self.scheduler.submit(csv_path, run_fleet, [(os.path.basename(csv_path), args)], generate_pdf_from_csv)
+        self.update_cancel_button()
 
-def generate_pdf_from_csv(csv_path, logo_path, report_title, footer_url, output_path):
-    doc = SimpleDocTemplate(output_path, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-    title_style = styles['Heading1']
-    desc_style = styles['BodyText']
-    ref_style = ParagraphStyle('ReferenceStyle', parent=styles['BodyText'], textColor=colors.blue)
-    rationale_style = styles['Italic']
-    
-    elements.append(Paragraph(report_title, title_style))
-    
-    if logo_path:
-        try:
-            pil_img = PILImage.open(logo_path)
-            w, h = pil_img.size
-            aspect_ratio = w / h
-            new_width = min(150, w)
-            new_height = new_width / aspect_ratio
-            pil_img = pil_img.resize((int(new_width), int(new_height)), PILImage.LANCZOS)
-            logo_path_resized = "temp_resized_logo.png"
-            pil_img.save(logo_path_resized, "PNG")
-            logo = Image(logo_path_resized)
-            elements.append(logo)
-        except Exception as e:
-            print(f"Error processing logo: {e}")
-    
-    with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            elements.append(Paragraph(f"Failed: {row['Title']}", title_style))
-            elements.append(Paragraph(f"Description: {row['Description']}", desc_style))
-            elements.append(Paragraph(f"Reference: {row['References']}", ref_style))
-            elements.append(Spacer(1, 12))  
-            elements.append(Paragraph(f"Rationale: {row['Rationale']}", rationale_style))
-            elements.append(Spacer(1, inch))
+    def update_cancel_button(self):
+        waiting = [batch for batch in self.scheduler.pending() if batch.state == 'queued']
+        self.cancel_button.config(state="normal" if waiting else "disabled")
 
-    def footer(canvas, doc):
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        footer_text = f"{footer_url} - Generated on: {timestamp}"
-        canvas.saveState()
-        canvas.drawString(inch, 0.75 * inch, footer_text)
-        canvas.drawRightString(10 * inch - 2*inch, 0.75 * inch, f"Page {canvas.getPageNumber()}")
-        canvas.restoreState()
-        
-    doc.build(elements, onFirstPage=footer, onLaterPages=footer)
-    
-    return True
+    def poll_scheduler(self):
+        for event in self.scheduler.poll():
+            self.update_cancel_button()
+            batch = event.batch
+            if event.kind == 'started':
+                self.status_label.config(text="Status: Generating... (cannot be cancelled once started)")
+            if event.kind != 'finished':
+                continue
+            if batch.state == 'cancelled':
+                self.status_label.config(text="Status: PDF Generation Cancelled")
+            elif batch.summary and batch.summary.succeeded:
+                self.status_label.config(text="Status: PDF Generation Successful!")
+            else:
+                self.status_label.config(text="Status: PDF Generation Failed!")
+                errors = [r.error.splitlines()[0] for r in batch.summary.failed] if batch.summary else [str(batch.error)]
+                messagebox.showerror("PDF Generation", f"{batch.label}:\n" + '\n'.join(errors))
+        self.root.after(POLL_MS, self.poll_scheduler)
+
+    def exit(self):
+        self.scheduler.shutdown()
+        self.root.quit()
 
-root = tk.Tk()
-root.geometry("450x350")  # 800 pixels wide and 500 pixels tall
-app = PDFGeneratorApp(root)
-root.mainloop()
\ No newline at end of file
+if __name__ == '__main__':
+    root = tk.Tk()
+    root.geometry("450x350")  # 800 pixels wide and 500 pixels tall
+    app = PDFGeneratorApp(root)
+    root.mainloop()